@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-from commo_dashboard import create_equal_weight_index, create_regional_indexes, create_sector_indexes, load_latest_news
+import warnings
+from commo_dashboard import create_equal_weight_indexes, create_crack_spread_index, create_regional_indexes, create_sector_indexes, combine_indexes, index_frame_key, normalize_to_base, load_latest_news, HTML_ESCAPE
 from classification_loader import load_raw_sql_data_cached, apply_classification
 
 st.set_page_config(layout="wide", initial_sidebar_state="expanded", menu_items=None)
@@ -41,7 +43,8 @@ def load_data(start_date='2024-01-01'):
     df_raw = load_raw_sql_data_cached(start_date=None)
 
     # Filter by date in-memory (fast)
-    df_filtered = df_raw[df_raw['Date'] >= pd.to_datetime(start_date)].copy()
+    # No copy needed: apply_classification copies before adding columns
+    df_filtered = df_raw[df_raw['Date'] >= pd.to_datetime(start_date)]
 
     # Apply FRESH classification (MongoDB cached 60s, re-applied every page load)
     df_classified = apply_classification(df_filtered)
@@ -50,111 +53,75 @@ def load_data(start_date='2024-01-01'):
     df = df_classified.dropna(subset=['Group', 'Region', 'Sector'])
     return df
 
-@st.cache_data
+def sign_colors(values):
+    """Red/green/black text by sign for a whole column at once (one Styler call per column, not per cell)"""
+    return np.select([values < 0, values > 0], ['color: red', 'color: green'], default='color: black')
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_stock_price_cached(ticker, start_date):
+    """Stock price history from TCBS, cached 1 hour per (ticker, start_date)"""
+    from ssi_api import fetch_historical_price
+    return fetch_historical_price(ticker, start_date=start_date)
+
+# Key on a cheap fingerprint instead of hashing every row of df on each rerun. Shared read-only
+# across sessions: cache_resource skips the per-hit copy of every index frame, and nothing on
+# this page mutates them (get_index_data returns them as-is, charts copy before assigning).
+@st.cache_resource(ttl=3600, hash_funcs={pd.DataFrame: index_frame_key})
 def build_indexes(df):
     # Exclude NaN groups (unclassified tickers used for ticker-specific input/output)
-    all_groups = df['Group'].dropna().unique()
-    all_indexes = {}
-
-    for group in all_groups:
-        if group != 'Crack Spread':
-            all_indexes[group] = create_equal_weight_index(df, group)
+    all_indexes = create_equal_weight_indexes(df[df['Group'] != 'Crack Spread'], 'Group')
 
     # Handle Crack Spread separately
-    crack_spread_df = df[df['Group'] == 'Crack Spread'].copy()
-    crack_spread_df = crack_spread_df.drop_duplicates(subset=['Date', 'Ticker'], keep='last')
-    crack_pivot = crack_spread_df.pivot(index='Date', columns='Ticker', values='Price')
-    crack_avg = crack_pivot.abs().mean(axis=1)
-    all_indexes['Crack Spread'] = pd.DataFrame({
-        'Date': crack_avg.index,
-        'Index_Value': crack_avg.values
-    })
+    all_indexes['Crack Spread'] = create_crack_spread_index(df[df['Group'] == 'Crack Spread'])
 
     # Combine all indexes
-    first_group = list(all_indexes.keys())[0]
-    combined_df = all_indexes[first_group].copy()
-    combined_df.rename(columns={'Index_Value': first_group}, inplace=True)
-
-    for group in list(all_indexes.keys())[1:]:
-        temp_df = all_indexes[group].copy()
-        temp_df.rename(columns={'Index_Value': group}, inplace=True)
-        combined_df = combined_df.merge(temp_df, on='Date', how='outer')
-
-    combined_df = combined_df.sort_values('Date')
+    combined_df = combine_indexes(all_indexes)
     # Removed ffill() - use raw indexes for performance calculations to avoid stale forward-filled data
 
     # Regional indexes
     regional_indexes = create_regional_indexes(df)
-
-    if len(regional_indexes) > 0:
-        first_regional = list(regional_indexes.keys())[0]
-        regional_combined_df = regional_indexes[first_regional].copy()
-        regional_combined_df.rename(columns={'Index_Value': first_regional}, inplace=True)
-
-        for key in list(regional_indexes.keys())[1:]:
-            temp_df = regional_indexes[key].copy()
-            temp_df.rename(columns={'Index_Value': key}, inplace=True)
-            regional_combined_df = regional_combined_df.merge(temp_df, on='Date', how='outer')
-
-        regional_combined_df = regional_combined_df.sort_values('Date')
-        regional_combined_df = regional_combined_df.ffill()
-    else:
-        regional_combined_df = pd.DataFrame()
+    regional_combined_df = combine_indexes(regional_indexes).ffill()
 
     # Sector indexes
     sector_indexes = create_sector_indexes(df)
+    sector_combined_df = combine_indexes(sector_indexes).ffill()
 
-    if len(sector_indexes) > 0:
-        first_sector = list(sector_indexes.keys())[0]
-        sector_combined_df = sector_indexes[first_sector].copy()
-        sector_combined_df.rename(columns={'Index_Value': first_sector}, inplace=True)
+    # Price history per commodity Name, so get_index_data is a dict lookup instead of a df scan
+    name_prices = {
+        name: name_df[['Date', 'Price']].sort_values('Date')
+        for name, name_df in df.groupby('Name', observed=True)
+    }
 
-        for sector in list(sector_indexes.keys())[1:]:
-            temp_df = sector_indexes[sector].copy()
-            temp_df.rename(columns={'Index_Value': sector}, inplace=True)
-            sector_combined_df = sector_combined_df.merge(temp_df, on='Date', how='outer')
+    return all_indexes, combined_df, regional_indexes, regional_combined_df, sector_indexes, sector_combined_df, name_prices
 
-        sector_combined_df = sector_combined_df.sort_values('Date')
-        sector_combined_df = sector_combined_df.ffill()
-    else:
-        sector_combined_df = pd.DataFrame()
-
-    return all_indexes, combined_df, regional_indexes, regional_combined_df, sector_indexes, sector_combined_df
-
-def get_index_data(item, group, region, df, all_indexes, regional_indexes):
-    """Get price data for an item with fallback to regional/group index"""
+def get_index_data(item, group, region, name_prices, all_indexes, regional_indexes):
+    """Get price data for an item with fallback to regional/group index (read-only, not copied)"""
     if item and item.strip():
-        # Use Name column for commodity series (matches MongoDB mappings and commo_list Item)
-        item_data = df[df['Name'] == item].copy()
-        if not item_data.empty:
-            return item_data[['Date', 'Price']].sort_values('Date')
+        # Keyed by Name (matches MongoDB mappings and commo_list Item)
+        if item in name_prices:
+            return name_prices[item]
 
     if region and region.strip() and region.lower() != 'nan' and region.lower() != 'none':
         key = f"{group} - {region}"
         if key in regional_indexes:
-            index_df = regional_indexes[key].copy()
-            index_df.rename(columns={'Index_Value': 'Price'}, inplace=True)
-            return index_df
+            return regional_indexes[key].rename(columns={'Index_Value': 'Price'})
 
     if group and group in all_indexes:
-        index_df = all_indexes[group].copy()
-        index_df.rename(columns={'Index_Value': 'Price'}, inplace=True)
-        return index_df
+        return all_indexes[group].rename(columns={'Index_Value': 'Price'})
 
     return None
 
-def create_aggregated_index(items_list, df, all_indexes, regional_indexes, base_value=100):
+def create_aggregated_index(items_list, name_prices, all_indexes, regional_indexes, base_value=100):
     """Create equal-weighted index from multiple items"""
     all_prices = []
 
     for item_info in items_list:
         item_data = get_index_data(
             item_info['item'], item_info['group'], item_info['region'],
-            df, all_indexes, regional_indexes
+            name_prices, all_indexes, regional_indexes
         )
 
         if item_data is not None and not item_data.empty:
-            item_data = item_data.copy()
             item_name = f"{item_info.get('item', item_info['group'])}_Price"
             item_data = item_data.rename(columns={'Price': item_name})
             all_prices.append(item_data.set_index('Date'))
@@ -162,16 +129,28 @@ def create_aggregated_index(items_list, df, all_indexes, regional_indexes, base_
     if not all_prices:
         return None
 
-    combined = pd.concat(all_prices, axis=1)
-    returns = combined.pct_change(fill_method=None)
-    avg_returns = returns.mean(axis=1, skipna=True)
-    index_values = (1 + avg_returns).cumprod() * base_value
-    index_values.iloc[0] = base_value
+    # Align all price series on Date, then work on a plain float array
+    combined = pd.concat(all_prices, axis=1, sort=True)
+    prices = combined.to_numpy(dtype='float64', na_value=np.nan)
+
+    # Returns (first row has no prior price), equal-weighted; days with no returns stay NaN
+    returns = np.full_like(prices, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = prices[1:] / prices[:-1] - 1
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        avg_returns = np.nanmean(returns, axis=1)
+
+    # Build index, compounding through days without returns as pandas cumprod does
+    missing = np.isnan(avg_returns)
+    index_values = np.cumprod(np.where(missing, 1.0, 1 + avg_returns)) * base_value
+    index_values[missing] = np.nan
+    index_values[0] = base_value
 
-    return pd.DataFrame({'Date': index_values.index, 'Price': index_values.values}).reset_index(drop=True)
+    return pd.DataFrame({'Date': combined.index, 'Price': index_values})
 
 @st.cache_data
-def calculate_all_ticker_spreads(_df, _all_indexes, _regional_indexes, ticker_mapping):
+def calculate_all_ticker_spreads(_name_prices, _all_indexes, _regional_indexes, ticker_mapping):
     """Vectorized calculation of spreads for all tickers"""
     spread_data = []
 
@@ -182,26 +161,26 @@ def calculate_all_ticker_spreads(_df, _all_indexes, _regional_indexes, ticker_ma
         input_data = None
         if ticker_info.get('inputs'):
             if len(ticker_info['inputs']) > 1:
-                input_data = create_aggregated_index(ticker_info['inputs'], _df, _all_indexes, _regional_indexes)
+                input_data = create_aggregated_index(ticker_info['inputs'], _name_prices, _all_indexes, _regional_indexes)
             else:
                 input_data = get_index_data(
                     ticker_info['inputs'][0]['item'],
                     ticker_info['inputs'][0]['group'],
                     ticker_info['inputs'][0]['region'],
-                    _df, _all_indexes, _regional_indexes
+                    _name_prices, _all_indexes, _regional_indexes
                 )
 
         # Get output data
         output_data = None
         if ticker_info.get('outputs'):
             if len(ticker_info['outputs']) > 1:
-                output_data = create_aggregated_index(ticker_info['outputs'], _df, _all_indexes, _regional_indexes)
+                output_data = create_aggregated_index(ticker_info['outputs'], _name_prices, _all_indexes, _regional_indexes)
             else:
                 output_data = get_index_data(
                     ticker_info['outputs'][0]['item'],
                     ticker_info['outputs'][0]['group'],
                     ticker_info['outputs'][0]['region'],
-                    _df, _all_indexes, _regional_indexes
+                    _name_prices, _all_indexes, _regional_indexes
                 )
 
         # Calculate percentage changes
@@ -209,7 +188,7 @@ def calculate_all_ticker_spreads(_df, _all_indexes, _regional_indexes, ticker_ma
         output_5d = output_10d = output_50d = output_150d = 0
 
         if input_data is not None and not input_data.empty:
-            input_data = input_data.sort_values('Date').reset_index(drop=True)
+            # Series from get_index_data/create_aggregated_index are already in Date order
             latest = input_data['Price'].iloc[-1]
             input_5d = ((latest - input_data['Price'].iloc[-6]) / input_data['Price'].iloc[-6] * 100) if len(input_data) > 5 else 0
             input_10d = ((latest - input_data['Price'].iloc[-11]) / input_data['Price'].iloc[-11] * 100) if len(input_data) > 10 else 0
@@ -217,7 +196,6 @@ def calculate_all_ticker_spreads(_df, _all_indexes, _regional_indexes, ticker_ma
             input_150d = ((latest - input_data['Price'].iloc[-151]) / input_data['Price'].iloc[-151] * 100) if len(input_data) > 150 else 0
 
         if output_data is not None and not output_data.empty:
-            output_data = output_data.sort_values('Date').reset_index(drop=True)
             latest = output_data['Price'].iloc[-1]
             output_5d = ((latest - output_data['Price'].iloc[-6]) / output_data['Price'].iloc[-6] * 100) if len(output_data) > 5 else 0
             output_10d = ((latest - output_data['Price'].iloc[-11]) / output_data['Price'].iloc[-11] * 100) if len(output_data) > 10 else 0
@@ -265,7 +243,7 @@ st.sidebar.divider()
 
 # Load data
 df = load_data(start_date=start_date_str)
-all_indexes, combined_df, regional_indexes, regional_combined_df, sector_indexes, sector_combined_df = build_indexes(df)
+all_indexes, combined_df, regional_indexes, regional_combined_df, sector_indexes, sector_combined_df, name_prices = build_indexes(df)
 
 # Streamlit Dashboard
 col_title, col_update = st.columns([3, 1])
@@ -286,7 +264,7 @@ with col_update:
 from mongodb_utils import load_ticker_mappings, load_catalysts, get_catalyst
 ticker_mapping = load_ticker_mappings()
 
-spreads_df = calculate_all_ticker_spreads(df, all_indexes, regional_indexes, ticker_mapping)
+spreads_df = calculate_all_ticker_spreads(name_prices, all_indexes, regional_indexes, ticker_mapping)
 
 # Add absolute value columns for sorting by largest movers
 spreads_df['Abs_Spread_5D'] = spreads_df['Spread_5D'].abs()
@@ -313,8 +291,8 @@ with tab1:
     summary_data = []
     for group in all_indexes.keys():
         # Use raw index data (not forward-filled combined_df) for accurate performance metrics
-        index_df = all_indexes[group].sort_values('Date')
-        index_data = index_df['Index_Value']
+        # Index frames come out of build_indexes in Date order
+        index_data = all_indexes[group]['Index_Value']
 
         change_5d = ((index_data.iloc[-1] / index_data.iloc[-6]) - 1) * 100 if len(index_data) >= 6 else 0
         change_10d = ((index_data.iloc[-1] / index_data.iloc[-11]) - 1) * 100 if len(index_data) >= 11 else 0
@@ -337,16 +315,12 @@ with tab1:
 
     col1, col2, col3, col4 = st.columns(4)
 
-    def color_negative_red(val):
-        color = 'red' if val < 0 else 'green' if val > 0 else 'black'
-        return f'color: {color}'
-
     with col1:
         st.write("**5D Swings**")
         # Top 10 by absolute change
         top_10_5d = summary_df.nlargest(10, '5D Abs Swing')[['Group', '5D Change (%)']]
         st.dataframe(
-            top_10_5d.style.map(color_negative_red, subset=['5D Change (%)']).format({'5D Change (%)': '{:.2f}'}),
+            top_10_5d.style.apply(sign_colors, subset=['5D Change (%)']).format({'5D Change (%)': '{:.2f}'}),
             hide_index=True,
             height=400
         )
@@ -356,7 +330,7 @@ with tab1:
         # Top 10 by absolute change
         top_10_10d = summary_df.nlargest(10, '10D Abs Swing')[['Group', '10D Change (%)']]
         st.dataframe(
-            top_10_10d.style.map(color_negative_red, subset=['10D Change (%)']).format({'10D Change (%)': '{:.2f}'}),
+            top_10_10d.style.apply(sign_colors, subset=['10D Change (%)']).format({'10D Change (%)': '{:.2f}'}),
             hide_index=True,
             height=400
         )
@@ -366,7 +340,7 @@ with tab1:
         # Top 10 by absolute change
         top_10_50d = summary_df.nlargest(10, '50D Abs Swing')[['Group', '50D Change (%)']]
         st.dataframe(
-            top_10_50d.style.map(color_negative_red, subset=['50D Change (%)']).format({'50D Change (%)': '{:.2f}'}),
+            top_10_50d.style.apply(sign_colors, subset=['50D Change (%)']).format({'50D Change (%)': '{:.2f}'}),
             hide_index=True,
             height=400
         )
@@ -376,7 +350,7 @@ with tab1:
         # Top 10 by absolute change
         top_10_150d = summary_df.nlargest(10, '150D Abs Swing')[['Group', '150D Change (%)']]
         st.dataframe(
-            top_10_150d.style.map(color_negative_red, subset=['150D Change (%)']).format({'150D Change (%)': '{:.2f}'}),
+            top_10_150d.style.apply(sign_colors, subset=['150D Change (%)']).format({'150D Change (%)': '{:.2f}'}),
             hide_index=True,
             height=400
         )
@@ -507,8 +481,8 @@ with tab1:
                 fig_group = go.Figure()
 
                 # Get group index data
+                # Copy: build_indexes' frames are shared via cache_resource (already in Date order)
                 group_index = all_indexes[selected_group].copy()
-                group_index = group_index.sort_values('Date')
 
                 # Normalize to base 100
                 first_value = group_index['Index_Value'].iloc[0]
@@ -559,29 +533,28 @@ with tab1:
                 fig_components = go.Figure()
 
                 # Get all commodity names in this group
-                group_data = df[df['Group'] == selected_group].copy()
-                names_list = group_data['Name'].unique()
+                names_list = df.loc[df['Group'] == selected_group, 'Name'].unique()
 
                 # Color palette for components
                 colors = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#00f2fe', '#43e97b', '#38f9d7', '#fa709a', '#fee140', '#30cfd0']
 
+                # Collect traces and add them in one call instead of one add_trace per component
+                traces = []
                 for idx, name in enumerate(names_list):
-                    item_data = group_data[group_data['Name'] == name].copy()
-                    item_data = item_data.sort_values('Date')
-
-                    if not item_data.empty:
-                        # Normalize to base 100
-                        first_price = item_data['Price'].iloc[0]
-                        item_data['Normalized'] = (item_data['Price'] / first_price) * 100
-
-                        fig_components.add_trace(go.Scatter(
-                            x=item_data['Date'],
-                            y=item_data['Normalized'],
+                    item_data = name_prices[name]
+
+                    # Normalize to base 100 on the raw array; skip series with no usable base price
+                    normalized = normalize_to_base(item_data['Price'].to_numpy(dtype='float64', na_value=np.nan))
+                    if normalized is not None:
+                        traces.append(go.Scatter(
+                            x=item_data['Date'].to_numpy(),
+                            y=normalized,
                             mode='lines',
                             name=name,
                             line=dict(color=colors[idx % len(colors)], width=2),
                             opacity=0.7
                         ))
+                fig_components.add_traces(traces)
 
                 fig_components.update_layout(
                     xaxis_title='', yaxis_title='Index (Base=100)',
@@ -610,16 +583,12 @@ with tab2:
     # Create 4-column layout
     col1, col2, col3, col4 = st.columns(4)
 
-    def color_spread(val):
-        color = 'red' if val < 0 else 'green' if val > 0 else 'black'
-        return f'color: {color}'
-
     with col1:
         st.write("**5D Spread**")
         # Top 10 by absolute spread
         top_5d = spreads_df.nlargest(10, 'Abs_Spread_5D')[['Ticker', 'Spread_5D']]
         st.dataframe(
-            top_5d.style.map(color_spread, subset=['Spread_5D']).format({'Spread_5D': '{:.2f}'}),
+            top_5d.style.apply(sign_colors, subset=['Spread_5D']).format({'Spread_5D': '{:.2f}'}),
             hide_index=True,
             height=400
         )
@@ -629,7 +598,7 @@ with tab2:
         # Top 10 by absolute spread
         top_10d = spreads_df.nlargest(10, 'Abs_Spread_10D')[['Ticker', 'Spread_10D']]
         st.dataframe(
-            top_10d.style.map(color_spread, subset=['Spread_10D']).format({'Spread_10D': '{:.2f}'}),
+            top_10d.style.apply(sign_colors, subset=['Spread_10D']).format({'Spread_10D': '{:.2f}'}),
             hide_index=True,
             height=400
         )
@@ -639,7 +608,7 @@ with tab2:
         # Top 10 by absolute spread
         top_50d = spreads_df.nlargest(10, 'Abs_Spread_50D')[['Ticker', 'Spread_50D']]
         st.dataframe(
-            top_50d.style.map(color_spread, subset=['Spread_50D']).format({'Spread_50D': '{:.2f}'}),
+            top_50d.style.apply(sign_colors, subset=['Spread_50D']).format({'Spread_50D': '{:.2f}'}),
             hide_index=True,
             height=400
         )
@@ -649,7 +618,7 @@ with tab2:
         # Top 10 by absolute spread
         top_150d = spreads_df.nlargest(10, 'Abs_Spread_150D')[['Ticker', 'Spread_150D']]
         st.dataframe(
-            top_150d.style.map(color_spread, subset=['Spread_150D']).format({'Spread_150D': '{:.2f}'}),
+            top_150d.style.apply(sign_colors, subset=['Spread_150D']).format({'Spread_150D': '{:.2f}'}),
             hide_index=True,
             height=400
         )
@@ -688,8 +657,38 @@ with tab2:
 
             if ticker_data:
                 # Fetch stock data
-                from ssi_api import fetch_historical_price
-                stock_data = fetch_historical_price(selected_chart_ticker, start_date='2024-01-01')
+                stock_data = fetch_stock_price_cached(selected_chart_ticker, '2024-01-01')
+
+                # Resolve and normalize inputs/outputs once; the input, output and spread charts share them
+                side_series = {}
+                for side, aggregated_label in [('inputs', 'Aggregated Input Index'), ('outputs', 'Aggregated Output Index')]:
+                    side_items = ticker_data.get(side)
+                    side_normalized = None
+                    side_label = None
+                    if side_items:
+                        if len(side_items) > 1:
+                            side_data = create_aggregated_index(side_items, name_prices, all_indexes, regional_indexes)
+                            side_label = aggregated_label
+                        else:
+                            side_data = get_index_data(
+                                side_items[0]['item'],
+                                side_items[0]['group'],
+                                side_items[0]['region'],
+                                name_prices, all_indexes, regional_indexes
+                            )
+                            side_label = side_items[0]['group']
+
+                        if side_data is not None and not side_data.empty:
+                            normalized = normalize_to_base(side_data['Price'].to_numpy(dtype='float64', na_value=np.nan))
+                            if normalized is not None:
+                                side_normalized = pd.DataFrame({
+                                    'Date': side_data['Date'].to_numpy(),
+                                    'Normalized': normalized
+                                })
+                    side_series[side] = (side_normalized, side_label)
+
+                input_normalized, input_label = side_series['inputs']
+                output_normalized, output_label = side_series['outputs']
 
                 # Create 2x2 grid
                 chart_col1, chart_col2 = st.columns(2)
@@ -699,30 +698,14 @@ with tab2:
                     st.markdown("**Input Commodities (Costs)**")
                     fig_inputs = go.Figure()
 
-                    if ticker_data.get('inputs'):
-                        if len(ticker_data['inputs']) > 1:
-                            input_data = create_aggregated_index(ticker_data['inputs'], df, all_indexes, regional_indexes)
-                            label = 'Aggregated Input Index'
-                        else:
-                            input_data = get_index_data(
-                                ticker_data['inputs'][0]['item'],
-                                ticker_data['inputs'][0]['group'],
-                                ticker_data['inputs'][0]['region'],
-                                df, all_indexes, regional_indexes
-                            )
-                            label = ticker_data['inputs'][0]['group']
-
-                        if input_data is not None and not input_data.empty:
-                            first_price = input_data['Price'].dropna().iloc[0]
-                            if first_price:
-                                input_data['Normalized'] = (input_data['Price'] / first_price) * 100
-                                fig_inputs.add_trace(go.Scatter(
-                                    x=input_data['Date'],
-                                    y=input_data['Normalized'],
-                                    mode='lines',
-                                    name=label,
-                                    line=dict(color='#ff6b6b', width=2)
-                                ))
+                    if input_normalized is not None:
+                        fig_inputs.add_trace(go.Scattergl(
+                            x=input_normalized['Date'].to_numpy(),
+                            y=input_normalized['Normalized'].to_numpy(),
+                            mode='lines',
+                            name=input_label,
+                            line=dict(color='#ff6b6b', width=2)
+                        ))
 
                     fig_inputs.update_layout(
                         xaxis_title='', yaxis_title='Index (Base=100)',
@@ -736,30 +719,14 @@ with tab2:
                     st.markdown("**Output Commodities (Products)**")
                     fig_outputs = go.Figure()
 
-                    if ticker_data.get('outputs'):
-                        if len(ticker_data['outputs']) > 1:
-                            output_data = create_aggregated_index(ticker_data['outputs'], df, all_indexes, regional_indexes)
-                            label = 'Aggregated Output Index'
-                        else:
-                            output_data = get_index_data(
-                                ticker_data['outputs'][0]['item'],
-                                ticker_data['outputs'][0]['group'],
-                                ticker_data['outputs'][0]['region'],
-                                df, all_indexes, regional_indexes
-                            )
-                            label = ticker_data['outputs'][0]['group']
-
-                        if output_data is not None and not output_data.empty:
-                            first_price = output_data['Price'].dropna().iloc[0]
-                            if first_price:
-                                output_data['Normalized'] = (output_data['Price'] / first_price) * 100
-                                fig_outputs.add_trace(go.Scatter(
-                                    x=output_data['Date'],
-                                    y=output_data['Normalized'],
-                                    mode='lines',
-                                    name=label,
-                                    line=dict(color='#4ecdc4', width=2)
-                                ))
+                    if output_normalized is not None:
+                        fig_outputs.add_trace(go.Scattergl(
+                            x=output_normalized['Date'].to_numpy(),
+                            y=output_normalized['Normalized'].to_numpy(),
+                            mode='lines',
+                            name=output_label,
+                            line=dict(color='#4ecdc4', width=2)
+                        ))
 
                     fig_outputs.update_layout(
                         xaxis_title='', yaxis_title='Index (Base=100)',
@@ -775,14 +742,14 @@ with tab2:
                     st.markdown(f"**{selected_chart_ticker} Stock Price**")
                     fig_stock = go.Figure()
 
+                    stock_normalized = None
                     if stock_data is not None and not stock_data.empty:
-                        stock_data = stock_data.sort_values('Date')
-                        first_price = stock_data['Price'].iloc[0]
-                        stock_data['Normalized'] = (stock_data['Price'] / first_price) * 100
+                        stock_normalized = normalize_to_base(stock_data['Price'].to_numpy(dtype='float64', na_value=np.nan))
 
-                        fig_stock.add_trace(go.Scatter(
-                            x=stock_data['Date'],
-                            y=stock_data['Normalized'],
+                    if stock_normalized is not None:
+                        fig_stock.add_trace(go.Scattergl(
+                            x=stock_data['Date'].to_numpy(),
+                            y=stock_normalized,
                             mode='lines',
                             name=selected_chart_ticker,
                             line=dict(color='#95a5a6', width=2)
@@ -800,44 +767,6 @@ with tab2:
                     st.markdown("**Spread (Output - Input)**")
                     fig_spread = go.Figure()
 
-                    # Get input data
-                    input_normalized = None
-                    if ticker_data.get('inputs'):
-                        if len(ticker_data['inputs']) > 1:
-                            input_data = create_aggregated_index(ticker_data['inputs'], df, all_indexes, regional_indexes)
-                        else:
-                            input_data = get_index_data(
-                                ticker_data['inputs'][0]['item'],
-                                ticker_data['inputs'][0]['group'],
-                                ticker_data['inputs'][0]['region'],
-                                df, all_indexes, regional_indexes
-                            )
-
-                        if input_data is not None and not input_data.empty:
-                            input_first = input_data['Price'].dropna().iloc[0]
-                            if input_first:
-                                input_normalized = input_data.copy()
-                                input_normalized['Normalized'] = (input_normalized['Price'] / input_first) * 100
-
-                    # Get output data
-                    output_normalized = None
-                    if ticker_data.get('outputs'):
-                        if len(ticker_data['outputs']) > 1:
-                            output_data = create_aggregated_index(ticker_data['outputs'], df, all_indexes, regional_indexes)
-                        else:
-                            output_data = get_index_data(
-                                ticker_data['outputs'][0]['item'],
-                                ticker_data['outputs'][0]['group'],
-                                ticker_data['outputs'][0]['region'],
-                                df, all_indexes, regional_indexes
-                            )
-
-                        if output_data is not None and not output_data.empty:
-                            output_first = output_data['Price'].dropna().iloc[0]
-                            if output_first:
-                                output_normalized = output_data.copy()
-                                output_normalized['Normalized'] = (output_normalized['Price'] / output_first) * 100
-
                     # Handle missing inputs/outputs by treating as flat line at base 100 (0% change)
                     if input_normalized is None and output_normalized is not None:
                         # Missing input - create flat line at 100
@@ -995,7 +924,7 @@ with st.expander("Insights from Sell-Side Reports - All Commodities", expanded=F
 
         for item in all_news_sorted:
             # Escape special characters for HTML display
-            news_text = item['news'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            news_text = item['news'].translate(HTML_ESCAPE)
 
             # Add each card to the HTML string
             all_cards_html += f'''<div style="background: white; border-left: 4px solid #667eea; padding: 16px; margin: 12px 0; border-radius: 8px; box-shadow: 0 2px 6px rgba(0,0,0,0.08); transition: box-shadow 0.3s ease;">
@@ -66,15 +66,18 @@ def apply_classification(df):
     # Use 'Name' column if it exists (from SQL), otherwise use 'Ticker' (legacy CSV)
     mapping_column = 'Name' if 'Name' in df.columns else 'Ticker'
 
-    df['Group'] = df[mapping_column].map(group_map)
-    df['Region'] = df[mapping_column].map(region_map)
-    df['Sector'] = df[mapping_column].map(sector_map)
+    # Categorical Group/Region/Sector: cheaper equality filters/groupby on the repeated labels
+    df['Group'] = df[mapping_column].map(group_map).astype('category')
+    df['Region'] = df[mapping_column].map(region_map).astype('category')
+    df['Sector'] = df[mapping_column].map(sector_map).astype('category')
 
     return df
 
 
 
-@st.cache_data(ttl=21600)  # 6 hours - GLOBAL cache shared across all pages
+# 6 hours - GLOBAL cache shared across all pages. cache_resource hands every page the same
+# frame instead of unpickling a full copy of the price history on each rerun.
+@st.cache_resource(ttl=21600)
 def load_raw_sql_data_cached(start_date=None):
     """
     Load RAW commodity price data from SQL Server (cached 6 hours GLOBALLY).
@@ -85,6 +88,9 @@ def load_raw_sql_data_cached(start_date=None):
     This is the SINGLE source of truth for SQL data loading. All pages should use this
     function instead of defining their own cached loaders.
 
+    The returned DataFrame is shared, not copied: treat it as read-only (apply_classification
+    copies before adding columns).
+
     Args:
         start_date: Optional start date filter (YYYY-MM-DD format).
                    Default None fetches all available data.
@@ -103,6 +109,12 @@ def load_raw_sql_data_cached(start_date=None):
     if cols_to_drop:
         df = df.drop(columns=cols_to_drop)
 
+    # Ticker/Name repeat on every row; categorical codes hash/compare much faster and use less memory.
+    # Categorical Name also makes apply_classification's .map() work per category, not per row.
+    for col in ['Ticker', 'Name']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
     return df
 
 
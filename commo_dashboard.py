@@ -2,6 +2,26 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+# Single-pass translation table for escaping news text embedded in HTML
+HTML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+def index_frame_key(df):
+    """
+    Cheap fingerprint of a classified price DataFrame for st.cache_data hash_funcs.
+    Avoids pickling the whole frame on each rerun; changes when the date range, row count,
+    group/region membership counts, any (Date, Price) row, or any Name's group/region changes
+    (i.e. on a SQL refresh with revised prices or on reclassification).
+    """
+    return (
+        len(df),
+        df['Date'].min(),
+        df['Date'].max(),
+        tuple(df['Group'].value_counts().sort_index().items()),
+        tuple(df['Region'].value_counts().sort_index().items()),
+        # Vectorized content checksum over the columns the indexes depend on
+        int(pd.util.hash_pandas_object(df[['Date', 'Name', 'Group', 'Region', 'Price']], index=False).sum())
+    )
+
 def create_equal_weight_index(df, group_name, base_value=100):
     """
     Creates an equal-weighted index for a commodity group based on daily returns.
@@ -51,6 +71,123 @@ def create_equal_weight_index(df, group_name, base_value=100):
     return result
 
 
+def create_equal_weight_indexes(df, by, base_value=100):
+    """
+    Creates equal-weighted indexes for every value of `by` in one vectorized pass.
+    Same calculation as create_equal_weight_index (returns between consecutive dates of each
+    index's own calendar, averaged across available tickers), without a filter + pivot per index.
+
+    Parameters:
+    - df: DataFrame with columns ['Date', 'Ticker', 'Price'] plus the `by` column(s)
+    - by: Column name (e.g. 'Group') or list of column names (e.g. ['Group', 'Region'])
+    - base_value: Starting value of each index (default: 100)
+
+    Returns:
+    - Dictionary keyed by the `by` value (tuple for several columns), in order of first
+      appearance, with ['Date', 'Index_Value'] DataFrames as values
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+
+    # Remove duplicates, keep last value for each index-Date-Ticker combination
+    data = df[keys + ['Date', 'Ticker', 'Price']].dropna(subset=keys)
+    data = data.drop_duplicates(subset=keys + ['Date', 'Ticker'], keep='last')
+    if data.empty:
+        return {}
+    order = list(data[keys].drop_duplicates().itertuples(index=False, name=None))
+
+    # Row position of each date on its index's calendar (the rows of the per-index pivot)
+    data = data.assign(_pos=data.groupby(keys, observed=True)['Date'].rank(method='dense'))
+    data = data.sort_values(keys + ['Ticker', '_pos'])
+
+    # Daily returns: only against the same ticker on the immediately preceding index date
+    by_ticker = data.groupby(keys + ['Ticker'], observed=True)
+    prev_price = by_ticker['Price'].shift().astype('float64')
+    consecutive = by_ticker['_pos'].shift() == data['_pos'] - 1
+    # float64 returns even when prices are stored as float32, so compounding stays accurate
+    returns = (data['Price'].astype('float64') / prev_price - 1).where(consecutive)
+
+    # Equal weight - average returns across available tickers each day
+    avg_returns = returns.groupby([data[k] for k in keys] + [data['Date']], observed=True).mean()
+
+    # Build each index starting from base value
+    index_values = (1 + avg_returns).groupby(level=keys, observed=True).cumprod() * base_value
+    first_day = avg_returns.groupby(level=keys, observed=True).cumcount().to_numpy() == 0
+    index_values[first_day] = base_value
+
+    # Split per index (group keys normalised to tuples to match `order`)
+    per_index = {
+        key if isinstance(key, tuple) else (key,): values
+        for key, values in index_values.groupby(level=keys, observed=True)
+    }
+
+    indexes = {}
+    for key in order:
+        values = per_index[key]
+        indexes[key if len(keys) > 1 else key[0]] = pd.DataFrame({
+            'Date': values.index.get_level_values('Date'),
+            'Index_Value': values.values
+        })
+
+    return indexes
+
+def create_crack_spread_index(df):
+    """
+    Creates the Crack Spread index as the average absolute spread across tickers each day.
+    Spreads can be negative, so they are averaged directly instead of compounded from returns.
+
+    Parameters:
+    - df: DataFrame with columns ['Date', 'Ticker', 'Price'] (already filtered to Crack Spread rows)
+
+    Returns:
+    - DataFrame with ['Date', 'Index_Value']
+    """
+    # Keep last value for each Date-Ticker combination, then average per date (no dense pivot).
+    # Masking earlier duplicates to NaN avoids materialising a deduplicated copy of the frame.
+    is_last = ~df.duplicated(subset=['Date', 'Ticker'], keep='last')
+    crack_avg = df['Price'].abs().where(is_last).groupby(df['Date']).mean()
+
+    return pd.DataFrame({
+        'Date': crack_avg.index,
+        'Index_Value': crack_avg.values
+    })
+
+
+def combine_indexes(indexes):
+    """
+    Combine index DataFrames into one wide DataFrame aligned on Date (outer join)
+
+    Parameters:
+    - indexes: Dictionary of name -> DataFrame with ['Date', 'Index_Value']
+
+    Returns:
+    - DataFrame with 'Date' plus one column per index, sorted by Date (empty DataFrame if no indexes)
+    """
+    if not indexes:
+        return pd.DataFrame()
+
+    # One columnar alignment instead of repeated pairwise outer merges
+    series = {name: index_df.set_index('Date')['Index_Value'] for name, index_df in indexes.items()}
+    return pd.concat(series, axis=1).sort_index().rename_axis('Date').reset_index()
+
+
+def normalize_to_base(prices, base_value=100):
+    """
+    Rebase a price series so its first finite price equals base_value (for base-100 charts)
+
+    Parameters:
+    - prices: 1D array-like of prices, may contain NaN
+    - base_value: Value the first finite price maps to (default: 100)
+
+    Returns:
+    - float64 numpy array, or None when there is no finite price or the first one is zero
+    """
+    prices = np.asarray(prices, dtype='float64')
+    finite = np.flatnonzero(np.isfinite(prices))
+    if finite.size == 0 or prices[finite[0]] == 0:
+        return None
+    return prices * (base_value / prices[finite[0]])
+
+
 def create_sector_indexes(df, base_value=100):
     """
     Create equal-weighted indexes for each Sector by aggregating all groups within that sector
@@ -110,41 +247,21 @@ def create_regional_indexes(df, base_value=100):
     regional_indexes = {}
 
     # Get unique Group-Region combinations
-    group_region_combos = df[['Group', 'Region']].drop_duplicates()
-    group_region_combos = group_region_combos[~group_region_combos['Region'].isna()]
-
-    for _, row in group_region_combos.iterrows():
-        group = row['Group']
-        region = row['Region']
-        key = f"{group} - {region}"
+    group_region_combos = df[['Group', 'Region']].dropna().drop_duplicates()
 
-        # Filter for this group-region combination
-        region_df = df[(df['Group'] == group) & (df['Region'] == region)].copy()
-        region_df = region_df.drop_duplicates(subset=['Date', 'Ticker'], keep='last')
+    # All non-Crack Spread combinations in one pass
+    is_crack = df['Group'] == 'Crack Spread'
+    equal_weight = create_equal_weight_indexes(df[~is_crack], ['Group', 'Region'], base_value)
+    crack_df = df[is_crack]
 
-        # Skip if no data
-        if len(region_df) == 0:
-            continue
+    for group, region in group_region_combos.itertuples(index=False, name=None):
+        key = f"{group} - {region}"
 
         # For Crack Spread, use average absolute value
         if group == 'Crack Spread':
-            pivot_df = region_df.pivot(index='Date', columns='Ticker', values='Price')
-            avg_values = pivot_df.abs().mean(axis=1)
-            regional_indexes[key] = pd.DataFrame({
-                'Date': avg_values.index,
-                'Index_Value': avg_values.values
-            })
+            regional_indexes[key] = create_crack_spread_index(crack_df[crack_df['Region'] == region])
         else:
-            # Create equal-weight index
-            pivot_df = region_df.pivot(index='Date', columns='Ticker', values='Price')
-            returns_df = pivot_df.pct_change(fill_method=None)
-            avg_returns = returns_df.mean(axis=1, skipna=True)
-            index_values = (1 + avg_returns).cumprod() * base_value
-            index_values.iloc[0] = base_value
-            regional_indexes[key] = pd.DataFrame({
-                'Date': index_values.index,
-                'Index_Value': index_values.values
-            })
+            regional_indexes[key] = equal_weight[(group, region)]
 
     return regional_indexes
 
@@ -159,24 +276,8 @@ def load_latest_news(group_name):
     - List of dict with 'date', 'report_file', and 'news' for the group
     """
     try:
-        from mongodb_utils import load_reports
-        reports = load_reports()
-
-        # Extract news for this commodity group
-        news_items = []
-        for report in reports:
-            commodity_news = report.get('commodity_news', {})
-            group_news = commodity_news.get(group_name, "")
-
-            if group_news and group_news.strip():
-                news_items.append({
-                    'date': report.get('report_date', 'Unknown'),
-                    'report_file': report.get('report_file', ''),
-                    'news': group_news
-                })
-
-        return news_items
-
+        from mongodb_utils import load_news_by_group
+        return list(load_news_by_group().get(group_name, []))
     except Exception as e:
         print(f"Error loading news: {e}")
         return []
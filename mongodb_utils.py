@@ -1,8 +1,10 @@
 """
 MongoDB utility functions for Commodity Dashboard
 """
-from pymongo import MongoClient
+from pymongo import MongoClient, InsertOne
+from pymongo.errors import BulkWriteError
 import os
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
@@ -32,6 +34,13 @@ def get_mongo_client():
     client = MongoClient(mongo_uri)
     return client
 
+# Reuse a single pooled client per process instead of reconnecting on every call
+# (cache_resource survives reruns and is shared across sessions)
+if HAS_STREAMLIT:
+    get_mongo_client = st.cache_resource(get_mongo_client)
+else:
+    get_mongo_client = lru_cache(maxsize=1)(get_mongo_client)
+
 def get_database():
     """
     Get the commodity dashboard database
@@ -58,6 +67,11 @@ def get_iris_mongo_client():
     client = MongoClient(mongo_uri)
     return client
 
+if HAS_STREAMLIT:
+    get_iris_mongo_client = st.cache_resource(get_iris_mongo_client)
+else:
+    get_iris_mongo_client = lru_cache(maxsize=1)(get_iris_mongo_client)
+
 
 def get_iris_database():
     """
@@ -152,6 +166,30 @@ def load_reports() -> List[Dict[str, Any]]:
 if HAS_STREAMLIT:
     load_reports = st.cache_data(ttl=300)(load_reports)
 
+def load_news_by_group() -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Index report news by commodity group in a single pass over all reports
+
+    Returns:
+    - Dict mapping group name to a list of dicts with 'date', 'report_file' and 'news',
+      in report order (newest first)
+    """
+    news_by_group = {}
+    for report in load_reports():
+        for group_name, group_news in report.get('commodity_news', {}).items():
+            if group_news and group_news.strip():
+                news_by_group.setdefault(group_name, []).append({
+                    'date': report.get('report_date', 'Unknown'),
+                    'report_file': report.get('report_file', ''),
+                    'news': group_news
+                })
+
+    return news_by_group
+
+# Cache the function only if Streamlit is available
+if HAS_STREAMLIT:
+    load_news_by_group = st.cache_data(ttl=300)(load_news_by_group)
+
 def save_reports(reports: List[Dict[str, Any]]) -> bool:
     """
     Save reports to MongoDB (replaces all existing data)
@@ -179,6 +217,7 @@ def save_reports(reports: List[Dict[str, Any]]) -> bool:
         # Clear the cache so new data is loaded (only if using Streamlit)
         if HAS_STREAMLIT and hasattr(load_reports, 'clear'):
             load_reports.clear()
+            load_news_by_group.clear()
 
         return True
     except Exception as e:
@@ -329,6 +368,33 @@ def get_catalyst_history(commodity_group: str, limit: int = 10) -> List[Dict[str
 
     return catalysts
 
+def _build_catalyst_document(
+    commodity_group: str,
+    summary: str,
+    timeline: List[Dict[str, str]],
+    search_trigger: str,
+    direction: Optional[str],
+    now: datetime
+) -> Dict[str, Any]:
+    """
+    Build a catalyst document with search date and 5-day cooldown stamped from `now`
+    """
+    catalyst = {
+        "commodity_group": commodity_group,
+        "summary": summary,
+        "timeline": timeline,
+        "search_date": now.strftime("%Y-%m-%d"),
+        "date_created": now.isoformat(),
+        "search_trigger": search_trigger,
+        "cooldown_until": (now + timedelta(days=5)).isoformat()
+    }
+
+    # Add direction if provided
+    if direction:
+        catalyst["direction"] = direction
+
+    return catalyst
+
 def save_catalyst(
     commodity_group: str,
     summary: str,
@@ -353,24 +419,10 @@ def save_catalyst(
         db = get_iris_database()
         collection = db["commodity_news"]
 
-        now = datetime.utcnow()
-        search_date = now.strftime("%Y-%m-%d")
-        cooldown_until = now + timedelta(days=5)
-
         # Create new catalyst document
-        new_catalyst = {
-            "commodity_group": commodity_group,
-            "summary": summary,
-            "timeline": timeline,
-            "search_date": search_date,
-            "date_created": now.isoformat(),
-            "search_trigger": search_trigger,
-            "cooldown_until": cooldown_until.isoformat()
-        }
-
-        # Add direction if provided
-        if direction:
-            new_catalyst["direction"] = direction
+        new_catalyst = _build_catalyst_document(
+            commodity_group, summary, timeline, search_trigger, direction, datetime.utcnow()
+        )
 
         # Insert new document
         collection.insert_one(new_catalyst)
@@ -393,6 +445,66 @@ def save_catalyst(
             print(msg)
         return False
 
+def save_catalysts_bulk(
+    catalysts: List[Dict[str, Any]],
+    search_trigger: str = "auto"
+) -> List[bool]:
+    """
+    Save several catalysts in one bulk write (single round trip to IRIS database)
+
+    Parameters:
+    - catalysts: List of dicts with "commodity_group", "summary", "timeline" and optional "direction"
+    - search_trigger: "auto" or "manual"
+
+    Returns:
+    - List[bool]: Success flag for each catalyst, in input order
+    """
+    if not catalysts:
+        return []
+
+    try:
+        db = get_iris_database()
+        collection = db["commodity_news"]
+
+        now = datetime.utcnow()
+        operations = [
+            InsertOne(_build_catalyst_document(
+                c["commodity_group"],
+                c.get("summary", ""),
+                c.get("timeline", []),
+                search_trigger,
+                c.get("direction"),
+                now
+            ))
+            for c in catalysts
+        ]
+
+        # Unordered so one failing insert does not block the rest
+        success = [True] * len(operations)
+        try:
+            collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                success[error["index"]] = False
+
+        # Create indexes for faster queries
+        collection.create_index([("commodity_group", 1), ("date_created", -1)])
+        collection.create_index("date_created")
+
+        # Clear the cache so new data is loaded (only if using Streamlit)
+        if HAS_STREAMLIT and hasattr(load_catalysts, 'clear'):
+            load_catalysts.clear()
+
+        return success
+
+    except Exception as e:
+        msg = f"Error saving catalysts to MongoDB: {e}"
+        if HAS_STREAMLIT:
+            st.error(msg)
+        else:
+            print(msg)
+        return [False] * len(catalysts)
+
 def can_auto_trigger(commodity_group: str) -> Tuple[bool, str]:
     """
     Check if auto-trigger is allowed for a commodity (5-day cooldown)
@@ -410,13 +522,17 @@ def can_auto_trigger(commodity_group: str) -> Tuple[bool, str]:
     if not latest_catalyst:
         return True, "No previous search found"
 
-    cooldown_until_str = latest_catalyst.get("cooldown_until")
+    return _cooldown_status(latest_catalyst.get("cooldown_until"), datetime.utcnow())
+
+def _cooldown_status(cooldown_until_str: Optional[str], now: datetime) -> Tuple[bool, str]:
+    """
+    Evaluate a stored cooldown_until timestamp against `now`
+    """
     if not cooldown_until_str:
         return True, "No cooldown set"
 
     try:
         cooldown_until = datetime.fromisoformat(cooldown_until_str)
-        now = datetime.utcnow()
 
         if now < cooldown_until:
             days_remaining = (cooldown_until - now).days
@@ -428,3 +544,32 @@ def can_auto_trigger(commodity_group: str) -> Tuple[bool, str]:
     except Exception as e:
         # If error parsing date, allow trigger
         return True, f"Cooldown check error: {e}"
+
+def bulk_cooldown_status(commodity_groups: List[str]) -> Dict[str, Tuple[bool, str]]:
+    """
+    Check auto-trigger cooldown for many commodity groups with a single query
+    (same rules as can_auto_trigger, one round trip instead of one per group)
+
+    Parameters:
+    - commodity_groups: Names of the commodity groups
+
+    Returns:
+    - Dict[str, Tuple[bool, str]]: group -> (can_trigger, message)
+    """
+    db = get_iris_database()
+    collection = db["commodity_news"]
+
+    # Latest cooldown per group (uses the commodity_group + date_created index)
+    pipeline = [
+        {"$match": {"commodity_group": {"$in": list(commodity_groups)}}},
+        {"$sort": {"date_created": -1}},
+        {"$group": {"_id": "$commodity_group", "cooldown_until": {"$first": "$cooldown_until"}}}
+    ]
+    latest_cooldowns = {doc["_id"]: doc.get("cooldown_until") for doc in collection.aggregate(pipeline)}
+
+    now = datetime.utcnow()
+    return {
+        group: _cooldown_status(latest_cooldowns[group], now) if group in latest_cooldowns
+        else (True, "No previous search found")
+        for group in commodity_groups
+    }
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from classification_loader import load_raw_sql_data_cached, apply_classification, get_classification_df
+from commo_dashboard import index_frame_key
 
 st.set_page_config(layout="wide", initial_sidebar_state="expanded", page_title="Individual Item Viewer")
 
@@ -45,12 +46,23 @@ def load_data():
 
     return df
 
+# Shared read-only across sessions. index_frame_key checksums Date/Name/Group/Region/Price, so
+# revised prices or reclassified Names rebuild the histories instead of serving stale ones
+@st.cache_resource(ttl=3600, hash_funcs={pd.DataFrame: index_frame_key})
+def build_name_prices(df):
+    """Date-sorted Date/Price history per commodity Name, so per-item lookups never rescan df_all"""
+    return {
+        name: name_df[['Date', 'Price']].sort_values('Date')
+        for name, name_df in df.groupby('Name', observed=True)
+    }
+
 @st.cache_data(ttl=3600)
 def load_classification_data():
     """Load classification structure for dropdown filters (cached 1 hour)."""
     return get_classification_df()
 
 df_all = load_data()
+name_prices = build_name_prices(df_all)
 classification_df = load_classification_data()
 
 # Time period aggregation function
@@ -195,12 +207,11 @@ if len(available_items) > 0:
     summary_rows = []
 
     for item in available_items:
-        # Filter by Name column (not Ticker) since item comes from commo_list Item
+        # Keyed by Name (not Ticker) since item comes from commo_list Item
         # Use all available data for accurate metric calculations
-        item_df = df_all[df_all['Name'] == item][['Date', 'Price']].copy()
-        item_df = item_df.sort_values('Date')
+        item_df = name_prices.get(item)
 
-        if len(item_df) == 0:
+        if item_df is None or len(item_df) == 0:
             continue
 
         # Get latest value
@@ -287,7 +298,7 @@ if len(available_items) > 0:
     # ============ CHART SECTION WITH FRAGMENT ============
     # Fragment wrapper - only chart reloads when controls change
     @st.fragment
-    def display_price_chart(df_all, selected_items):
+    def display_price_chart(df_all, name_prices, selected_items):
         if len(selected_items) > 0:
             gradient_header("Price Chart")
 
@@ -333,13 +344,13 @@ if len(available_items) > 0:
 
             # Prepare data for selected items
             # Filter for display timeframe
-            df_display = df_all[df_all['Date'] >= display_start_date].copy()
-
             chart_data = []
             for item in selected_items:
-                # Filter by Name column (not Ticker) since item comes from commo_list Item
-                item_df = df_display[df_display['Name'] == item][['Date', 'Price']].copy()
-                item_df = item_df.sort_values('Date')
+                # Keyed by Name (not Ticker) since item comes from commo_list Item
+                item_df = name_prices.get(item)
+                if item_df is None:
+                    item_df = pd.DataFrame(columns=['Date', 'Price'])
+                item_df = item_df[item_df['Date'] >= display_start_date]
 
                 # Aggregate by period
                 item_df_agg = aggregate_by_period(item_df, period)
@@ -347,7 +358,7 @@ if len(available_items) > 0:
                 # Normalize if needed
                 if display_mode == 'Normalized (Base 100)' and len(item_df_agg) > 0:
                     base_price = item_df_agg.iloc[0]['Price']
-                    item_df_agg['Price'] = (item_df_agg['Price'] / base_price) * 100
+                    item_df_agg = item_df_agg.assign(Price=(item_df_agg['Price'] / base_price) * 100)
 
                 chart_data.append((item, item_df_agg))
 
@@ -388,7 +399,7 @@ if len(available_items) > 0:
             st.info("💡 Select items from the sidebar to view price comparison chart")
 
     # Call the chart fragment
-    display_price_chart(df_all, selected_items)
+    display_price_chart(df_all, name_prices, selected_items)
 
 else:
     st.info("👆 Use sidebar filters to narrow down items, or view all items in the table")
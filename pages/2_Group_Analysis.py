@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import sys
 import os
@@ -7,7 +8,7 @@ import os
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from commo_dashboard import create_equal_weight_index, create_regional_indexes, load_latest_news
+from commo_dashboard import create_equal_weight_indexes, create_crack_spread_index, create_regional_indexes, combine_indexes, index_frame_key, load_latest_news, HTML_ESCAPE
 from classification_loader import load_raw_sql_data_cached, apply_classification
 from mongodb_utils import get_catalyst
 
@@ -49,58 +50,79 @@ def load_data():
     df = df_classified.dropna(subset=['Group', 'Region', 'Sector'])
     return df
 
-@st.cache_data
+CHANGE_PERIODS = ['5D', '10D', '50D']
+CHANGE_LAGS = np.array([6, 11, 51])
+
+def calculate_index_changes(index_df):
+    """5D/10D/50D percentage changes of an index (0 when there is not enough history)"""
+    values = index_df.sort_values('Date')['Index_Value'].to_numpy(dtype='float64')
+
+    # One ratio array for all periods instead of scalar iloc lookups
+    changes = np.zeros(len(CHANGE_LAGS))
+    available = CHANGE_LAGS <= len(values)
+    if available.any():
+        changes[available] = (values[-1] / values[-CHANGE_LAGS[available]] - 1) * 100
+
+    return dict(zip(CHANGE_PERIODS, changes.tolist()))
+
+def load_news_html(group_name):
+    """Escaped, merged news HTML for a group (uncached: load_news_by_group is already cached and cleared on save)"""
+    # Date header (bold) then escaped news text for each report, separated by rules
+    return "<hr>".join(
+        f"<strong>{item['date']}</strong><br><br>{item['news'].translate(HTML_ESCAPE)}"
+        for item in load_latest_news(group_name)
+    )
+
+# Key on a cheap fingerprint instead of hashing every row of df on each rerun. The ttl stays
+# within the raw SQL cache's 6 hours so stale entries for old fingerprints are dropped too.
+@st.cache_data(ttl=3600, hash_funcs={pd.DataFrame: index_frame_key})
 def build_indexes(df):
     # Exclude NaN groups
-    all_groups = df['Group'].dropna().unique()
-    all_indexes = {}
-
-    for group in all_groups:
-        if group != 'Crack Spread':
-            all_indexes[group] = create_equal_weight_index(df, group)
+    all_indexes = create_equal_weight_indexes(df[df['Group'] != 'Crack Spread'], 'Group')
 
     # Handle Crack Spread separately
-    crack_spread_df = df[df['Group'] == 'Crack Spread'].copy()
-    crack_spread_df = crack_spread_df.drop_duplicates(subset=['Date', 'Ticker'], keep='last')
-    crack_pivot = crack_spread_df.pivot(index='Date', columns='Ticker', values='Price')
-    crack_avg = crack_pivot.abs().mean(axis=1)
-    all_indexes['Crack Spread'] = pd.DataFrame({
-        'Date': crack_avg.index,
-        'Index_Value': crack_avg.values
-    })
+    all_indexes['Crack Spread'] = create_crack_spread_index(df[df['Group'] == 'Crack Spread'])
 
     # Combine all indexes
-    first_group = list(all_indexes.keys())[0]
-    combined_df = all_indexes[first_group].copy()
-    combined_df.rename(columns={'Index_Value': first_group}, inplace=True)
-
-    for group in list(all_indexes.keys())[1:]:
-        temp_df = all_indexes[group].copy()
-        temp_df.rename(columns={'Index_Value': group}, inplace=True)
-        combined_df = combined_df.merge(temp_df, on='Date', how='outer')
-
-    combined_df = combined_df.sort_values('Date')
+    combined_df = combine_indexes(all_indexes)
     # Removed ffill() - use raw indexes for performance calculations to avoid stale forward-filled data
 
     # Regional indexes
     regional_indexes = create_regional_indexes(df)
-
-    if len(regional_indexes) > 0:
-        first_regional = list(regional_indexes.keys())[0]
-        regional_combined_df = regional_indexes[first_regional].copy()
-        regional_combined_df.rename(columns={'Index_Value': first_regional}, inplace=True)
-
-        for key in list(regional_indexes.keys())[1:]:
-            temp_df = regional_indexes[key].copy()
-            temp_df.rename(columns={'Index_Value': key}, inplace=True)
-            regional_combined_df = regional_combined_df.merge(temp_df, on='Date', how='outer')
-
-        regional_combined_df = regional_combined_df.sort_values('Date')
-        # Removed ffill() - use raw regional_indexes for performance calculations
-    else:
-        regional_combined_df = pd.DataFrame()
-
-    return all_indexes, combined_df, regional_indexes, regional_combined_df
+    regional_combined_df = combine_indexes(regional_indexes)
+    # Removed ffill() - use raw regional_indexes for performance calculations
+
+    # Selectbox options and (key, region) pairs per group, so reruns skip sorting. Built from the
+    # same (Group, Region) pairs create_regional_indexes uses, since group names may contain ' - '
+    sorted_groups = sorted(all_indexes.keys())
+    regional_by_group = {}
+    for group, region in df[['Group', 'Region']].dropna().drop_duplicates().itertuples(index=False, name=None):
+        key = f"{group} - {region}"
+        if key in regional_indexes:
+            regional_by_group.setdefault(group, []).append((key, region))
+
+    # Component names per group / (group, region) - one groupby instead of a df scan per rerun
+    group_names = {
+        group: sorted(names.dropna().unique())
+        for group, names in df.groupby('Group', observed=True)['Name']
+    }
+    regional_names = {
+        key: sorted(names.dropna().unique())
+        for key, names in df.groupby(['Group', 'Region'], observed=True)['Name']
+    }
+
+    # Price history per component name, so the Components view never rescans df
+    component_prices = {
+        name: name_df[['Date', 'Price']].sort_values('Date')
+        for name, name_df in df.groupby('Name', observed=True)
+    }
+
+    # 5D/10D/50D changes per group and regional index (raw, not forward-filled)
+    index_changes = {key: calculate_index_changes(index_df) for key, index_df in all_indexes.items()}
+    index_changes.update({key: calculate_index_changes(index_df) for key, index_df in regional_indexes.items()})
+
+    return (all_indexes, combined_df, regional_indexes, regional_combined_df, sorted_groups, regional_by_group,
+            group_names, regional_names, component_prices, index_changes)
 
 # Load data
 df = load_data()
@@ -136,20 +158,20 @@ st.sidebar.caption(f"Data from: {start_date.strftime('%Y-%m-%d')}")
 st.sidebar.divider()
 
 # Build indexes after filtering
-all_indexes, combined_df, regional_indexes, regional_combined_df = build_indexes(df)
+(all_indexes, combined_df, regional_indexes, regional_combined_df, sorted_groups, regional_by_group,
+ group_names, regional_names, component_prices, index_changes) = build_indexes(df)
 
 # Sidebar for group selection
 selected_group = st.sidebar.selectbox(
     'Select Commodity Group',
-    options=sorted(list(all_indexes.keys()))
+    options=sorted_groups
 )
 
 # Page Title with selected group
 st.title(f'{selected_group}')
 
-# Use raw index data (not forward-filled combined_df) for accurate performance metrics
-index_df = all_indexes[selected_group].sort_values('Date')
-index_data = index_df['Index_Value']
+# Precomputed from raw index data (not forward-filled combined_df) for accurate performance metrics
+group_changes = index_changes[selected_group]
 
 # Helper function for color coding
 def get_color(value):
@@ -158,7 +180,7 @@ def get_color(value):
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    change_5d = ((index_data.iloc[-1] / index_data.iloc[-6]) - 1) * 100 if len(index_data) >= 6 else 0
+    change_5d = group_changes['5D']
     color = get_color(change_5d)
     st.markdown(f"""
         <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
@@ -168,7 +190,7 @@ with col1:
     """, unsafe_allow_html=True)
 
 with col2:
-    change_10d = ((index_data.iloc[-1] / index_data.iloc[-11]) - 1) * 100 if len(index_data) >= 11 else 0
+    change_10d = group_changes['10D']
     color = get_color(change_10d)
     st.markdown(f"""
         <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
@@ -178,7 +200,7 @@ with col2:
     """, unsafe_allow_html=True)
 
 with col3:
-    change_50d = ((index_data.iloc[-1] / index_data.iloc[-51]) - 1) * 100 if len(index_data) >= 51 else 0
+    change_50d = group_changes['50D']
     color = get_color(change_50d)
     st.markdown(f"""
         <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
@@ -197,19 +219,19 @@ view_mode = st.radio(
 fig = go.Figure()
 
 if view_mode == 'Index':
-    # Plot the index
+    # Plot the index (NumPy arrays take Plotly's fast serialisation path; float32 halves the payload)
     plot_df = combined_df[['Date', selected_group]].dropna()
 
     fig.add_trace(go.Scatter(
-        x=plot_df['Date'],
-        y=plot_df[selected_group],
+        x=plot_df['Date'].to_numpy(),
+        y=plot_df[selected_group].to_numpy(dtype='float32'),
         mode='lines',
         name=selected_group,
         line=dict(width=2)
     ))
 else:
     # Get component names
-    names = sorted(df[df['Group'] == selected_group]['Name'].unique())
+    names = group_names.get(selected_group, [])
 
     # Multi-select for components
     selected_names = st.multiselect(
@@ -219,17 +241,17 @@ else:
     )
 
     if selected_names:
-        # Plot each selected commodity name
-        for name in selected_names:
-            item_data = df[df['Name'] == name][['Date', 'Price']].sort_values('Date')
-
-            fig.add_trace(go.Scatter(
-                x=item_data['Date'],
-                y=item_data['Price'],
+        # Plot each selected commodity name, added to the figure in one call
+        fig.add_traces([
+            go.Scatter(
+                x=component_prices[name]['Date'].to_numpy(),
+                y=component_prices[name]['Price'].to_numpy(dtype='float32'),
                 mode='lines',
                 name=name,
                 line=dict(width=2)
-            ))
+            )
+            for name in selected_names
+        ])
     else:
         st.info('Please select at least one component to display.')
 
@@ -244,8 +266,7 @@ fig.update_layout(
 st.plotly_chart(fig, use_container_width=True)
 
 # Display commodity components below chart
-names = df[df['Group'] == selected_group]['Name'].unique()
-st.caption(f"**Components:** {', '.join(sorted(names))}")
+st.caption(f"**Components:** {', '.join(group_names.get(selected_group, []))}")
 
 # Catalyst Section
 st.divider()
@@ -290,20 +311,10 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
-news_items = load_latest_news(selected_group)
-
-if news_items:
-    # Merge all news items into one text box with scrollable container (using HTML)
-    merged_news = []
-    for item in news_items:  # Show all news items
-        # Escape special characters for HTML display
-        news_text = item['news'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-
-        # Add date header and news (using HTML for bold)
-        merged_news.append(f"<strong>{item['date']}</strong><br><br>{news_text}")
+news_content = load_news_html(selected_group)
 
+if news_content:
     # Display all merged news in a scrollable container with max height
-    news_content = "<hr>".join(merged_news)
     st.markdown(
         f'<div style="max-height: 400px; overflow-y: auto; padding: 10px; border: 1px solid #ddd; border-radius: 5px;">{news_content}</div>',
         unsafe_allow_html=True
@@ -312,76 +323,82 @@ else:
     st.info(f"No recent news found for {selected_group}")
 
 # Regional Sub-Indexes
-regional_keys = [key for key in regional_indexes.keys() if key.startswith(selected_group + ' - ')]
-
-if len(regional_keys) > 0:
+# Only the selected region's chart is built, and switching regions reruns just this fragment
+@st.fragment
+def render_regional_breakdown(selected_group, regional_entries):
     st.divider()
     st.subheader(f'{selected_group} - Regional Breakdown')
 
-    # Create tabs for each region
-    tabs = st.tabs([key.split(' - ')[1] for key in regional_keys])
+    region_labels = [region_name for _, region_name in regional_entries]
+    selected_region = st.radio(
+        'Region',
+        options=region_labels,
+        horizontal=True,
+        label_visibility='collapsed',
+        key=f'regional_breakdown_{selected_group}'
+    )
+    regional_key, region_name = regional_entries[region_labels.index(selected_region)]
 
-    for i, (tab, regional_key) in enumerate(zip(tabs, regional_keys)):
-        with tab:
-            region_name = regional_key.split(' - ')[1]
+    # Plot regional index
+    plot_df_regional = regional_combined_df[['Date', regional_key]].dropna()
 
-            # Plot regional index
-            plot_df_regional = regional_combined_df[['Date', regional_key]].dropna()
+    fig_regional = go.Figure()
+    fig_regional.add_trace(go.Scatter(
+        x=plot_df_regional['Date'].to_numpy(),
+        y=plot_df_regional[regional_key].to_numpy(dtype='float32'),
+        mode='lines',
+        name=regional_key,
+        line=dict(width=2)
+    ))
 
-            fig_regional = go.Figure()
-            fig_regional.add_trace(go.Scatter(
-                x=plot_df_regional['Date'],
-                y=plot_df_regional[regional_key],
-                mode='lines',
-                name=regional_key,
-                line=dict(width=2)
-            ))
-
-            fig_regional.update_layout(
-                xaxis_title='Date',
-                yaxis_title='Index Value' if selected_group != 'Crack Spread' else 'Average Absolute Value',
-                hovermode='x unified',
-                template='plotly_white',
-                height=400
-            )
+    fig_regional.update_layout(
+        xaxis_title='Date',
+        yaxis_title='Index Value' if selected_group != 'Crack Spread' else 'Average Absolute Value',
+        hovermode='x unified',
+        template='plotly_white',
+        height=400
+    )
 
-            st.plotly_chart(fig_regional, use_container_width=True)
-
-            # Show commodity names in this region below chart
-            regional_names = df[(df['Group'] == selected_group) & (df['Region'] == region_name)]['Name'].unique()
-            st.caption(f"**Components ({region_name}):** {', '.join(sorted(regional_names))}")
-
-            # Regional metrics - use raw regional index data
-            regional_index_df = regional_indexes[regional_key].sort_values('Date')
-            regional_data = regional_index_df['Index_Value']
-            col1r, col2r, col3r = st.columns(3)
-
-            with col1r:
-                change_5d_r = ((regional_data.iloc[-1] / regional_data.iloc[-6]) - 1) * 100 if len(regional_data) >= 6 else 0
-                color = get_color(change_5d_r)
-                st.markdown(f"""
-                    <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
-                        <div style="color: #6b7280; font-size: 13px; font-weight: 500;">5D Change</div>
-                        <div style="color: {color}; font-size: 24px; font-weight: 600; margin-top: 5px;">{change_5d_r:.2f}%</div>
-                    </div>
-                """, unsafe_allow_html=True)
-
-            with col2r:
-                change_10d_r = ((regional_data.iloc[-1] / regional_data.iloc[-11]) - 1) * 100 if len(regional_data) >= 11 else 0
-                color = get_color(change_10d_r)
-                st.markdown(f"""
-                    <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
-                        <div style="color: #6b7280; font-size: 13px; font-weight: 500;">10D Change</div>
-                        <div style="color: {color}; font-size: 24px; font-weight: 600; margin-top: 5px;">{change_10d_r:.2f}%</div>
-                    </div>
-                """, unsafe_allow_html=True)
-
-            with col3r:
-                change_50d_r = ((regional_data.iloc[-1] / regional_data.iloc[-51]) - 1) * 100 if len(regional_data) >= 51 else 0
-                color = get_color(change_50d_r)
-                st.markdown(f"""
-                    <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
-                        <div style="color: #6b7280; font-size: 13px; font-weight: 500;">50D Change</div>
-                        <div style="color: {color}; font-size: 24px; font-weight: 600; margin-top: 5px;">{change_50d_r:.2f}%</div>
-                    </div>
-                """, unsafe_allow_html=True)
+    st.plotly_chart(fig_regional, use_container_width=True)
+
+    # Show commodity names in this region below chart
+    st.caption(f"**Components ({region_name}):** {', '.join(regional_names.get((selected_group, region_name), []))}")
+
+    # Regional metrics - precomputed from raw regional index data
+    regional_changes = index_changes[regional_key]
+    col1r, col2r, col3r = st.columns(3)
+
+    with col1r:
+        change_5d_r = regional_changes['5D']
+        color = get_color(change_5d_r)
+        st.markdown(f"""
+            <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
+                <div style="color: #6b7280; font-size: 13px; font-weight: 500;">5D Change</div>
+                <div style="color: {color}; font-size: 24px; font-weight: 600; margin-top: 5px;">{change_5d_r:.2f}%</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col2r:
+        change_10d_r = regional_changes['10D']
+        color = get_color(change_10d_r)
+        st.markdown(f"""
+            <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
+                <div style="color: #6b7280; font-size: 13px; font-weight: 500;">10D Change</div>
+                <div style="color: {color}; font-size: 24px; font-weight: 600; margin-top: 5px;">{change_10d_r:.2f}%</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col3r:
+        change_50d_r = regional_changes['50D']
+        color = get_color(change_50d_r)
+        st.markdown(f"""
+            <div style="text-align: center; padding: 10px; background: white; border-radius: 8px; border: 1px solid #e5e7eb;">
+                <div style="color: #6b7280; font-size: 13px; font-weight: 500;">50D Change</div>
+                <div style="color: {color}; font-size: 24px; font-weight: 600; margin-top: 5px;">{change_50d_r:.2f}%</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+regional_entries = regional_by_group.get(selected_group, [])
+
+if len(regional_entries) > 0:
+    render_regional_breakdown(selected_group, regional_entries)
@@ -1,16 +1,18 @@
 #%%
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import json
 import sys
 import os
+import warnings
 
 # Get the parent directory path
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(parent_dir)
-from commo_dashboard import create_equal_weight_index, create_regional_indexes
+from commo_dashboard import create_equal_weight_indexes, create_crack_spread_index, create_regional_indexes, index_frame_key, normalize_to_base
 from ssi_api import fetch_historical_price
 from classification_loader import load_raw_sql_data_cached, apply_classification
 
@@ -35,6 +37,10 @@ def load_data():
 
     # Filter out items without classification
     df = df_classified.dropna(subset=['Group', 'Region', 'Sector'])
+
+    # float32 prices halve the bytes moved by the filters and groupbys below; index and
+    # correlation maths upcast to float64 where precision matters
+    df = df.astype({'Price': 'float32'})
     return df
 
 @st.cache_data
@@ -42,73 +48,95 @@ def load_ticker_mapping():
     # Add parent directory to path for imports
     sys.path.insert(0, parent_dir)
     from mongodb_utils import load_ticker_mappings
-    return load_ticker_mappings()
 
-@st.cache_data
-def build_indexes(df):
-    """Build both group-level and regional indexes"""
+    # Keyed by ticker so the selected ticker is a dict lookup
+    mapping = {}
+    for item in load_ticker_mappings():
+        item = dict(item)
+        for side in ('inputs', 'outputs'):
+            if item.get(side):
+                # Blank/'nan'/'none' regions become None once here, so lookups just test `if region:`
+                item[side] = [dict(entry) for entry in item[side]]
+                for entry in item[side]:
+                    region = str(entry.get('region') or '').strip()
+                    entry['region'] = region if region.lower() not in ('', 'nan', 'none') else None
+        mapping[item['ticker']] = item
+    return mapping
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_stock_price_cached(ticker, start_date):
+    """Stock price history from TCBS, cached 1 hour per (ticker, start_date)"""
+    return fetch_historical_price(ticker, start_date=start_date)
+
+# Shared read-only across sessions: cache_resource skips the per-hit deep copy of
+# the index dicts. get_index_data hands out these frames as-is, so callers must
+# treat them as read-only and build new frames instead of assigning columns.
+# Keyed on df_version (computed once per run) rather than hashing the frame again.
+@st.cache_resource(ttl=3600)
+def build_indexes(_df, df_version):
+    """Build group-level and regional indexes, plus price history per commodity Name"""
+    df = _df
     # Exclude NaN groups (unclassified tickers used for ticker-specific input/output)
-    all_groups = df['Group'].dropna().unique()
-    all_indexes = {}
-
-    for group in all_groups:
-        if group != 'Crack Spread':
-            all_indexes[group] = create_equal_weight_index(df, group)
+    all_indexes = create_equal_weight_indexes(df[df['Group'] != 'Crack Spread'], 'Group')
 
     # Handle Crack Spread separately
-    crack_spread_df = df[df['Group'] == 'Crack Spread'].copy()
+    crack_spread_df = df[df['Group'] == 'Crack Spread']
     if len(crack_spread_df) > 0:
-        crack_spread_df = crack_spread_df.drop_duplicates(subset=['Date', 'Ticker'], keep='last')
-        crack_pivot = crack_spread_df.pivot(index='Date', columns='Ticker', values='Price')
-        crack_avg = crack_pivot.abs().mean(axis=1)
-        all_indexes['Crack Spread'] = pd.DataFrame({
-            'Date': crack_avg.index,
-            'Index_Value': crack_avg.values
-        })
+        all_indexes['Crack Spread'] = create_crack_spread_index(crack_spread_df)
 
     # Regional indexes
     regional_indexes = create_regional_indexes(df)
 
-    return all_indexes, regional_indexes
+    # Store indexes with a Price column, as get_index_data returns them, so lookups skip the rename
+    all_indexes = {key: index_df.rename(columns={'Index_Value': 'Price'}) for key, index_df in all_indexes.items()}
+    regional_indexes = {key: index_df.rename(columns={'Index_Value': 'Price'}) for key, index_df in regional_indexes.items()}
 
-def get_index_data(item, group, region, df, all_indexes, regional_indexes):
+    # Price history per commodity Name (only names with any valid price), so get_index_data
+    # is a dict lookup instead of a df scan. Sorted once here: every series get_index_data and
+    # create_aggregated_index return is already in Date order, so callers do not re-sort.
+    name_prices = {
+        name: name_df[['Date', 'Price']].sort_values('Date')
+        for name, name_df in df.groupby('Name', observed=True)
+        if name_df['Price'].notna().any()
+    }
+
+    return all_indexes, regional_indexes, name_prices
+
+def get_index_data(item, group, region, name_prices, all_indexes, regional_indexes):
     """
     Get price data for an item. If item is None/empty or not found, use group or group-region index.
 
-    Returns: tuple of (DataFrame with Date and Price columns, display_name) or (None, None)
+    Returns: tuple of (DataFrame with Date and Price columns, display_name) or (None, None).
+    The DataFrame is the shared cached frame, not a copy - do not mutate it.
     """
     # Try to use specific item data first
     if item and item.strip():
         # Use Name column for commodity series (matches MongoDB mappings and commo_list Item)
-        item_data = df[df['Name'] == item].copy()
-        if not item_data.empty and item_data['Price'].notna().any():
-            return item_data[['Date', 'Price']].sort_values('Date'), item
+        if item in name_prices:
+            return name_prices[item], item
         # If item specified but not found or has no valid prices, continue to fallback
 
     # Fall back to regional index
-    if region and region.strip() and region.lower() != 'nan' and region.lower() != 'none':
+    # Regions are canonicalized in load_ticker_mapping (None when missing)
+    if region:
         key = f"{group} - {region}"
         if key in regional_indexes:
-            index_df = regional_indexes[key].copy()
-            index_df.rename(columns={'Index_Value': 'Price'}, inplace=True)
-            return index_df, f"{group} - {region} Index"
+            return regional_indexes[key], f"{group} - {region} Index"
         # If regional index not found, continue to group fallback
 
     # Fall back to group index
     if group and group in all_indexes:
-        index_df = all_indexes[group].copy()
-        index_df.rename(columns={'Index_Value': 'Price'}, inplace=True)
-        return index_df, f"{group} Index"
+        return all_indexes[group], f"{group} Index"
 
     return None, None
 
-def create_aggregated_index(items_list, df, all_indexes, regional_indexes, base_value=100):
+def create_aggregated_index(items_list, name_prices, all_indexes, regional_indexes, base_value=100):
     """
     Create an index from multiple items - uses sensitivity weighting if provided, otherwise equal-weighted.
 
     Parameters:
     - items_list: List of item dictionaries with 'item', 'group', 'region', 'sensitivity'
-    - df: Main dataframe
+    - name_prices: Dict of commodity Name -> Date/Price DataFrame (from build_indexes)
     - all_indexes: Group-level indexes
     - regional_indexes: Regional indexes
     - base_value: Starting value for the index
@@ -123,200 +151,323 @@ def create_aggregated_index(items_list, df, all_indexes, regional_indexes, base_
             item_info['item'],
             item_info['group'],
             item_info['region'],
-            df,
+            name_prices,
             all_indexes,
             regional_indexes
         )
 
         if item_data is not None and not item_data.empty:
-            item_data = item_data.copy()
-            item_name = display_name.replace(' Index', '_Index').replace(' - ', '_')
-            item_data = item_data.rename(columns={'Price': item_name})
-            all_prices.append(item_data.set_index('Date'))
+            all_prices.append(item_data.set_index('Date')['Price'])
             sensitivities.append(item_info.get('sensitivity'))
 
     if not all_prices:
         return None
 
-    # Combine all price series
-    combined = pd.concat(all_prices, axis=1)
+    # Align all price series on Date, then work on a plain float array
+    combined = pd.concat(all_prices, axis=1, sort=True)
+    prices = combined.to_numpy(dtype='float64', na_value=np.nan)
 
-    # Calculate returns
-    returns = combined.pct_change(fill_method=None)
+    # Calculate returns (first row has no prior price)
+    returns = np.full_like(prices, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = prices[1:] / prices[:-1] - 1
 
     # Check if we should use sensitivity weighting
     use_sensitivity = any(s is not None for s in sensitivities)
 
     if use_sensitivity:
         # Weighted average by sensitivity
-        weights = [s if s is not None else 0 for s in sensitivities]
-        total_weight = sum(weights)
+        weights = np.array([s if s is not None else 0 for s in sensitivities], dtype='float64')
+        total_weight = weights.sum()
 
         # Validate that weights sum to 1.0 (with small tolerance)
         if abs(total_weight - 1.0) > 0.01:
             st.warning(f"⚠️ Sensitivities sum to {total_weight:.3f}, not 1.0. Results may be scaled incorrectly.")
 
         # Apply weights to returns (no normalization)
-        avg_returns = (returns * weights).sum(axis=1, skipna=True)
+        avg_returns = np.nansum(returns * weights, axis=1)
     else:
-        # Equal-weight average (current behavior)
-        avg_returns = returns.mean(axis=1, skipna=True)
+        # Equal-weight average (current behavior); days with no returns stay NaN
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            avg_returns = np.nanmean(returns, axis=1)
 
-    # Build index
-    index_values = (1 + avg_returns).cumprod() * base_value
+    # Build index, compounding through days without returns as pandas cumprod does
+    missing = np.isnan(avg_returns)
+    index_values = np.cumprod(np.where(missing, 1.0, 1 + avg_returns)) * base_value
+    index_values[missing] = np.nan
 
     # Handle first value
-    first_valid_idx = index_values.first_valid_index()
-    if first_valid_idx is not None:
-        index_values.loc[first_valid_idx] = base_value
+    if (~missing).any():
+        index_values[np.argmax(~missing)] = base_value
 
     result = pd.DataFrame({
-        'Date': index_values.index,
-        'Price': index_values.values
-    }).reset_index(drop=True)
+        'Date': combined.index,
+        'Price': index_values
+    })
 
     return result
 
-def calculate_correlations(ticker, ticker_data, df, all_indexes, regional_indexes, stock_data):
+TRAILING_LAGS = np.array([6, 11, 51, 151])
+
+def trailing_changes(prices):
+    """
+    5D/10D/50D/150D percentage changes of a date-sorted price series in one vectorized step.
+
+    Returns: List of 4 changes (None where there is not enough history)
+    """
+    values = np.asarray(prices, dtype='float64')
+    available = TRAILING_LAGS <= len(values)
+    changes = np.full(len(TRAILING_LAGS), np.nan)
+    past = values[-TRAILING_LAGS[available]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        changes[available] = (values[-1] - past) / past * 100
+    return [change if ok else None for change, ok in zip(changes.tolist(), available)]
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def aggregated_index_cached(items_list, df_version, _name_prices, _all_indexes, _regional_indexes):
+    """
+    create_aggregated_index memoized on the items and a cheap data fingerprint, so the summary,
+    tables and charts for a ticker share one build instead of recomputing it on each use.
+
+    Parameters:
+    - items_list: List of item dictionaries with 'item', 'group', 'region', 'sensitivity'
+    - df_version: index_frame_key of the timeframe-filtered df (cache key for the data below)
+    - _name_prices, _all_indexes, _regional_indexes: Data from build_indexes (not hashed)
+
+    Returns: DataFrame with Date and Price columns (or None)
+    """
+    return create_aggregated_index(items_list, _name_prices, _all_indexes, _regional_indexes)
+
+def _masked_pearson(x, y, mask):
+    """
+    Pearson correlation of each column of y against x, using only the rows in that column's mask.
+    Equivalent to np.corrcoef per column, computed for all columns in one vectorized pass.
+
+    Parameters:
+    - x: 2D float array (rows x columns) of the reference series
+    - y: 2D float array (rows x columns) of the compared series
+    - mask: 2D bool array of rows to use per column
+
+    Returns: 1D array of correlations (NaN where fewer than 2 rows or zero variance)
+    """
+    n = mask.sum(axis=0)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dx = np.where(mask, x - x.sum(axis=0) / n, 0.0)
+        dy = np.where(mask, y - y.sum(axis=0) / n, 0.0)
+        corr = (dx * dy).sum(axis=0) / np.sqrt((dx * dx).sum(axis=0) * (dy * dy).sum(axis=0))
+    corr = np.clip(corr, -1, 1)
+    corr[n < 2] = np.nan
+    return corr
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def calculate_correlations(ticker, df_version, start_date, _ticker_data, _name_prices, _all_indexes, _regional_indexes, _stock_data):
     """
     Calculate correlations between stock price and commodity inputs/outputs.
     Returns both price-level and returns-based correlations.
+    Cached per (ticker, df_version, start_date) so reruns skip the alignment and Pearson pass.
 
     Parameters:
     - ticker: Stock ticker symbol
-    - ticker_data: Ticker mapping data with inputs/outputs
-    - df: Main dataframe
-    - all_indexes: Group-level indexes
-    - regional_indexes: Regional indexes
-    - stock_data: Stock price DataFrame with Date and Price columns
+    - df_version: index_frame_key of the filtered df (cache key for the data below)
+    - start_date: Timeframe start (YYYY-MM-DD) of the stock history (cache key)
+    - _ticker_data: Ticker mapping data with inputs/outputs (not hashed)
+    - _name_prices: Dict of commodity Name -> Date/Price DataFrame (from build_indexes, not hashed)
+    - _all_indexes: Group-level indexes (not hashed)
+    - _regional_indexes: Regional indexes (not hashed)
+    - _stock_data: Stock price DataFrame with Date and Price columns (not hashed)
 
     Returns: Tuple of (price_correlations, return_correlations) dictionaries
     """
-    if stock_data is None or stock_data.empty:
+    if _stock_data is None or _stock_data.empty:
         return {}, {}
 
     price_correlations = {}
     return_correlations = {}
 
-    stock_df = stock_data[['Date', 'Price']].copy()
-    stock_df['Date'] = pd.to_datetime(stock_df['Date']).dt.tz_localize(None)
-    stock_df = stock_df.rename(columns={'Price': 'Stock_Price'})
+    # Dates are naive datetime64 at ingest (SQL and ssi_api), so no per-call conversion
+    stock_df = _stock_data[['Date', 'Price']].rename(columns={'Price': 'Stock_Price'}).set_index('Date')
 
-    # Calculate correlations for inputs
-    for idx, inp in enumerate(ticker_data.get('inputs', [])):
-        item_data, display_name = get_index_data(
-            inp['item'], inp['group'], inp['region'],
-            df, all_indexes, regional_indexes
-        )
+    # Collect every input/output series as one column of a wide Date-indexed frame
+    series = {}
+    for prefix, items in (('Input', _ticker_data.get('inputs', [])), ('Output', _ticker_data.get('outputs', []))):
+        for idx, entry in enumerate(items):
+            item_data, display_name = get_index_data(
+                entry['item'], entry['group'], entry['region'],
+                _name_prices, _all_indexes, _regional_indexes
+            )
 
-        if item_data is not None and not item_data.empty:
-            item_data = item_data.copy()
-            item_data['Date'] = pd.to_datetime(item_data['Date']).dt.tz_localize(None)
-            # Merge on Date
-            merged = pd.merge(stock_df, item_data[['Date', 'Price']], on='Date', how='inner')
-            if len(merged) > 1:
-                # Price level correlation
-                price_corr = merged['Stock_Price'].corr(merged['Price'])
-                price_correlations[f'Input_{idx}_{display_name}'] = price_corr
-
-                # Returns correlation
-                merged['Stock_Return'] = merged['Stock_Price'].pct_change(fill_method=None)
-                merged['Commodity_Return'] = merged['Price'].pct_change(fill_method=None)
-                return_corr = merged['Stock_Return'].corr(merged['Commodity_Return'])
-                return_correlations[f'Input_{idx}_{display_name}'] = return_corr
-
-    # Calculate correlations for outputs
-    for idx, out in enumerate(ticker_data.get('outputs', [])):
-        item_data, display_name = get_index_data(
-            out['item'], out['group'], out['region'],
-            df, all_indexes, regional_indexes
-        )
+            if item_data is not None and not item_data.empty:
+                prices = item_data.set_index('Date')['Price']
+                series[f'{prefix}_{idx}_{display_name}'] = prices[~prices.index.duplicated(keep='last')]
 
-        if item_data is not None and not item_data.empty:
-            item_data = item_data.copy()
-            item_data['Date'] = pd.to_datetime(item_data['Date']).dt.tz_localize(None)
-            # Merge on Date
-            merged = pd.merge(stock_df, item_data[['Date', 'Price']], on='Date', how='inner')
-            if len(merged) > 1:
-                # Price level correlation
-                price_corr = merged['Stock_Price'].corr(merged['Price'])
-                price_correlations[f'Output_{idx}_{display_name}'] = price_corr
-
-                # Returns correlation
-                merged['Stock_Return'] = merged['Stock_Price'].pct_change(fill_method=None)
-                merged['Commodity_Return'] = merged['Price'].pct_change(fill_method=None)
-                return_corr = merged['Stock_Return'].corr(merged['Commodity_Return'])
-                return_correlations[f'Output_{idx}_{display_name}'] = return_corr
+    if not series:
+        return {}, {}
+
+    # One join against the stock instead of a merge per item
+    aligned = pd.concat(series, axis=1).join(stock_df['Stock_Price'], how='inner')
+    item_cols = list(series)
+
+    # Plain float64 arrays from here on: Stock_Price is the last column
+    values = aligned.to_numpy(dtype='float64', na_value=np.nan)
+    # Which dates each item actually has (a NaN price row still counts, as in a merge)
+    present = pd.concat(
+        {name: pd.Series(True, index=series[name].index) for name in item_cols}, axis=1
+    ).reindex(aligned.index).notna().to_numpy()
+    stock = np.broadcast_to(values[:, -1:], present.shape)
+    items = values[:, :-1]
+
+    # Price-level correlations for all items at once
+    price_corr = _masked_pearson(stock, items, present & ~np.isnan(stock) & ~np.isnan(items))
+
+    # Returns are taken between consecutive rows of each item's own merge with the stock
+    row_idx = np.arange(len(values))[:, None]
+    last_present = np.maximum.accumulate(np.where(present, row_idx, -1), axis=0)
+    prev = np.vstack([np.full((1, present.shape[1]), -1), last_present[:-1]])
+    has_prev = present & (prev >= 0)
+    prev = np.where(has_prev, prev, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stock_returns = stock / np.take_along_axis(stock, prev, axis=0) - 1
+        item_returns = items / np.take_along_axis(items, prev, axis=0) - 1
+    return_corr = _masked_pearson(
+        stock_returns, item_returns,
+        has_prev & ~np.isnan(stock_returns) & ~np.isnan(item_returns)
+    )
+
+    # Only items sharing more than one date with the stock get a correlation
+    for col_idx in np.flatnonzero(present.sum(axis=0) > 1):
+        price_correlations[item_cols[col_idx]] = price_corr[col_idx]
+        return_correlations[item_cols[col_idx]] = return_corr[col_idx]
 
     return price_correlations, return_correlations
 
-def calculate_ticker_summary(ticker, ticker_data, df, all_indexes, regional_indexes, aggregate_items=False):
+def resolve_side_index(items, name_prices, all_indexes, regional_indexes, df_version):
+    """
+    Series representing one side of a ticker: the aggregated index for multiple items,
+    otherwise the single item (or its group/regional fallback) used directly.
+
+    Returns: tuple of (DataFrame with Date and Price columns, display_name) or (None, None);
+    display_name is None for an aggregated index
+    """
+    if not items:
+        return None, None
+    if len(items) > 1:
+        return aggregated_index_cached(items, df_version, name_prices, all_indexes, regional_indexes), None
+    return get_index_data(items[0]['item'], items[0]['group'], items[0]['region'], name_prices, all_indexes, regional_indexes)
+
+def calculate_ticker_summary(ticker, input_data, output_data):
     """
     Calculate summary metrics for a ticker's inputs and outputs.
 
     Parameters:
     - ticker: Stock ticker symbol
-    - ticker_data: Ticker mapping data with inputs/outputs
-    - df: Main dataframe
-    - all_indexes: Group-level indexes
-    - regional_indexes: Regional indexes
-    - aggregate_items: Whether to aggregate multiple items into index
+    - input_data, output_data: Side series from resolve_side_index (or None)
 
     Returns: Dictionary with ticker summary metrics
     """
     summary = {'Ticker': ticker}
 
-    # Calculate input metrics - always use aggregated index for multiple inputs
-    if ticker_data['inputs']:
-        if len(ticker_data['inputs']) > 1:
-            input_data = create_aggregated_index(ticker_data['inputs'], df, all_indexes, regional_indexes)
+    for side, data in (('Input', input_data), ('Output', output_data)):
+        if data is not None and not data.empty:
+            changes = trailing_changes(data['Price'])
         else:
-            # Single input - use directly
-            input_data, _ = get_index_data(
-                ticker_data['inputs'][0]['item'],
-                ticker_data['inputs'][0]['group'],
-                ticker_data['inputs'][0]['region'],
-                df, all_indexes, regional_indexes
-            )
+            changes = [None] * 4
+        for period, change in zip(['5D', '10D', '50D', '150D'], changes):
+            summary[f'{side}_{period}'] = change
 
-        if input_data is not None and not input_data.empty:
-            input_data = input_data.sort_values('Date').reset_index(drop=True)
-            latest = input_data['Price'].iloc[-1]
-            summary['Input_5D'] = ((latest - input_data['Price'].iloc[-6]) / input_data['Price'].iloc[-6] * 100) if len(input_data) > 5 else None
-            summary['Input_10D'] = ((latest - input_data['Price'].iloc[-11]) / input_data['Price'].iloc[-11] * 100) if len(input_data) > 10 else None
-            summary['Input_50D'] = ((latest - input_data['Price'].iloc[-51]) / input_data['Price'].iloc[-51] * 100) if len(input_data) > 50 else None
-            summary['Input_150D'] = ((latest - input_data['Price'].iloc[-151]) / input_data['Price'].iloc[-151] * 100) if len(input_data) > 150 else None
-        else:
-            summary['Input_5D'] = summary['Input_10D'] = summary['Input_50D'] = summary['Input_150D'] = None
+    return summary
+
+def render_commodity_side(items, side, side_index, name_prices, all_indexes, regional_indexes, aggregate_items):
+    """
+    Render the metrics table and normalized price chart for a ticker's inputs or outputs.
+    Items are resolved (or aggregated) once and shared by the table and the chart.
+
+    Parameters:
+    - items: List of item dictionaries with 'item', 'group', 'region', 'sensitivity'
+    - side: 'Input' (falling prices are good) or 'Output' (rising prices are good)
+    - side_index: This side's series from resolve_side_index, reused here as the aggregated index
+    - name_prices, all_indexes, regional_indexes: Data from build_indexes
+    - aggregate_items: Whether to aggregate multiple items into index
+    """
+    # (display name, price data) per series shown in the table and chart
+    if aggregate_items and len(items) > 1:
+        aggregated_data = side_index
+        aggregated = aggregated_data is not None and not aggregated_data.empty
+        series = [(f'Aggregated {side} Index', aggregated_data)] if aggregated else []
     else:
-        summary['Input_5D'] = summary['Input_10D'] = summary['Input_50D'] = summary['Input_150D'] = None
+        series = []
+        for info in items:
+            item_data, display_name = get_index_data(info['item'], info['group'], info['region'], name_prices, all_indexes, regional_indexes)
+            series.append((display_name if display_name else 'N/A', item_data))
 
-    # Calculate output metrics - always use aggregated index for multiple outputs
-    if ticker_data['outputs']:
-        if len(ticker_data['outputs']) > 1:
-            output_data = create_aggregated_index(ticker_data['outputs'], df, all_indexes, regional_indexes)
+    rows = []
+    for display_name, item_data in series:
+        if item_data is not None and not item_data.empty:
+            pct_5d, pct_10d, pct_50d, pct_150d = trailing_changes(item_data['Price'])
         else:
-            # Single output - use directly
-            output_data, _ = get_index_data(
-                ticker_data['outputs'][0]['item'],
-                ticker_data['outputs'][0]['group'],
-                ticker_data['outputs'][0]['region'],
-                df, all_indexes, regional_indexes
-            )
+            pct_5d = pct_10d = pct_50d = pct_150d = None
+
+        rows.append({
+            'Data Source': display_name,
+            '5D %': pct_5d,
+            '10D %': pct_10d,
+            '50D %': pct_50d,
+            '150D %': pct_150d
+        })
 
-        if output_data is not None and not output_data.empty:
-            output_data = output_data.sort_values('Date').reset_index(drop=True)
-            latest = output_data['Price'].iloc[-1]
-            summary['Output_5D'] = ((latest - output_data['Price'].iloc[-6]) / output_data['Price'].iloc[-6] * 100) if len(output_data) > 5 else None
-            summary['Output_10D'] = ((latest - output_data['Price'].iloc[-11]) / output_data['Price'].iloc[-11] * 100) if len(output_data) > 10 else None
-            summary['Output_50D'] = ((latest - output_data['Price'].iloc[-51]) / output_data['Price'].iloc[-51] * 100) if len(output_data) > 50 else None
-            summary['Output_150D'] = ((latest - output_data['Price'].iloc[-151]) / output_data['Price'].iloc[-151] * 100) if len(output_data) > 150 else None
-        else:
-            summary['Output_5D'] = summary['Output_10D'] = summary['Output_50D'] = summary['Output_150D'] = None
-    else:
-        summary['Output_5D'] = summary['Output_10D'] = summary['Output_50D'] = summary['Output_150D'] = None
+    # Inputs: negative = green (cost down); outputs: positive = green (revenue up)
+    good_sign = -1 if side == 'Input' else 1
 
-    return summary
+    def color_change(val):
+        if val is None or pd.isna(val):
+            return ''
+        return 'color: green' if val * good_sign > 0 else 'color: red' if val * good_sign < 0 else ''
+
+    st.dataframe(pd.DataFrame(rows).style.format({
+        '5D %': '{:.2f}',
+        '10D %': '{:.2f}',
+        '50D %': '{:.2f}',
+        '150D %': '{:.2f}'
+    }, na_rep='-').map(color_change, subset=['5D %', '10D %', '50D %', '150D %']), hide_index=True)
+
+    # Plot commodities
+    st.write(f"**{side} Commodity Prices**")
+    fig = go.Figure()
+
+    # Collect traces and add them in one call instead of one add_trace per series
+    traces = []
+    for display_name, item_data in series:
+        if item_data is not None and not item_data.empty:
+            # Normalize to base 100 using first valid price
+            normalized = normalize_to_base(item_data['Price'].to_numpy(dtype='float64', na_value=np.nan))
+            if normalized is not None:
+                traces.append(go.Scattergl(
+                    x=item_data['Date'].to_numpy(),
+                    y=normalized.astype('float32'),
+                    mode='lines',
+                    name=display_name,
+                    line=dict(width=2)
+                ))
+    fig.add_traces(traces)
+
+    fig.update_layout(
+        xaxis_title='Date',
+        yaxis_title='Normalized Price (Base = 100)',
+        hovermode='x unified',
+        template='plotly_white',
+        height=400,
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=1.02,
+            xanchor='center',
+            x=0.5,
+            font=dict(size=12)
+        )
+    )
+    st.plotly_chart(fig, use_container_width=True, key=f"{side.lower()}_chart")
 
 # Load data
 df = load_data()
@@ -346,17 +497,20 @@ selected_timeframe = st.sidebar.radio(
 
 # Filter data by selected timeframe
 start_date = pd.to_datetime(timeframe_options[selected_timeframe])
-df = df[df['Date'] >= start_date].copy()
+df = df[df['Date'] >= start_date]
 
 st.sidebar.caption(f"Data from: {start_date.strftime('%Y-%m-%d')}")
 st.sidebar.divider()
 
 # Build indexes and load mappings after filtering
 ticker_mapping = load_ticker_mapping()
-all_indexes, regional_indexes = build_indexes(df)
+# Cheap fingerprint of the filtered data, computed once and used as the cache key for
+# build_indexes and every cached helper that takes the unhashed index dicts
+df_version = index_frame_key(df)
+all_indexes, regional_indexes, name_prices = build_indexes(df, df_version)
 
 # Get all tickers
-all_tickers = sorted([item['ticker'] for item in ticker_mapping])
+all_tickers = sorted(ticker_mapping)
 
 st.title('Ticker Commodity Analysis')
 
@@ -379,13 +533,18 @@ aggregate_items = st.sidebar.checkbox(
 )
 
 # Get ticker data
-ticker_data = next((item for item in ticker_mapping if item['ticker'] == selected_ticker), None)
+ticker_data = ticker_mapping.get(selected_ticker)
 
 if ticker_data:
     st.header(f'{selected_ticker} - Commodity Relationships')
 
+    # Each side's series (aggregated for multiple items), resolved once and shared by the
+    # summary metrics, the input/output panels and the combined view
+    input_index, input_name = resolve_side_index(ticker_data['inputs'], name_prices, all_indexes, regional_indexes, df_version)
+    output_index, output_name = resolve_side_index(ticker_data['outputs'], name_prices, all_indexes, regional_indexes, df_version)
+
     # Display summary table at the top
-    summary = calculate_ticker_summary(selected_ticker, ticker_data, df, all_indexes, regional_indexes, aggregate_items)
+    summary = calculate_ticker_summary(selected_ticker, input_index, output_index)
 
     # Calculate spread (Output - Input), treating None as 0
     spread_5d = (summary['Output_5D'] or 0) - (summary['Input_5D'] or 0)
@@ -435,119 +594,7 @@ if ticker_data:
     """, unsafe_allow_html=True)
 
     if ticker_data['inputs']:
-        input_items = []
-
-        # Check if aggregation is enabled and multiple inputs exist
-        if aggregate_items and len(ticker_data['inputs']) > 1:
-            aggregated_data = create_aggregated_index(ticker_data['inputs'], df, all_indexes, regional_indexes)
-            if aggregated_data is not None and not aggregated_data.empty:
-                aggregated_data = aggregated_data.sort_values('Date').reset_index(drop=True)
-                latest_price = aggregated_data['Price'].iloc[-1]
-
-                pct_5d = ((latest_price - aggregated_data['Price'].iloc[-6]) / aggregated_data['Price'].iloc[-6] * 100) if len(aggregated_data) > 5 else None
-                pct_10d = ((latest_price - aggregated_data['Price'].iloc[-11]) / aggregated_data['Price'].iloc[-11] * 100) if len(aggregated_data) > 10 else None
-                pct_50d = ((latest_price - aggregated_data['Price'].iloc[-51]) / aggregated_data['Price'].iloc[-51] * 100) if len(aggregated_data) > 50 else None
-                pct_150d = ((latest_price - aggregated_data['Price'].iloc[-151]) / aggregated_data['Price'].iloc[-151] * 100) if len(aggregated_data) > 150 else None
-
-                input_items.append({
-                    'Data Source': 'Aggregated Input Index',
-                    '5D %': pct_5d,
-                    '10D %': pct_10d,
-                    '50D %': pct_50d,
-                    '150D %': pct_150d
-                })
-        else:
-            for inp in ticker_data['inputs']:
-                item_data, actual_name = get_index_data(inp['item'], inp['group'], inp['region'], df, all_indexes, regional_indexes)
-
-                if item_data is not None and not item_data.empty:
-                    item_data = item_data.sort_values('Date').reset_index(drop=True)
-                    latest_price = item_data['Price'].iloc[-1]
-
-                    pct_5d = ((latest_price - item_data['Price'].iloc[-6]) / item_data['Price'].iloc[-6] * 100) if len(item_data) > 5 else None
-                    pct_10d = ((latest_price - item_data['Price'].iloc[-11]) / item_data['Price'].iloc[-11] * 100) if len(item_data) > 10 else None
-                    pct_50d = ((latest_price - item_data['Price'].iloc[-51]) / item_data['Price'].iloc[-51] * 100) if len(item_data) > 50 else None
-                    pct_150d = ((latest_price - item_data['Price'].iloc[-151]) / item_data['Price'].iloc[-151] * 100) if len(item_data) > 150 else None
-                else:
-                    pct_5d = pct_10d = pct_50d = pct_150d = None
-
-                input_items.append({
-                    'Data Source': actual_name if actual_name else 'N/A',
-                    '5D %': pct_5d,
-                    '10D %': pct_10d,
-                    '50D %': pct_50d,
-                    '150D %': pct_150d
-                })
-
-        input_df = pd.DataFrame(input_items)
-
-        def color_input(val):
-            # For inputs: negative = green (cost down), positive = red (cost up)
-            if val is None or pd.isna(val):
-                return ''
-            return 'color: green' if val < 0 else 'color: red' if val > 0 else ''
-
-        st.dataframe(input_df.style.format({
-            '5D %': '{:.2f}',
-            '10D %': '{:.2f}',
-            '50D %': '{:.2f}',
-            '150D %': '{:.2f}'
-        }, na_rep='-').map(color_input, subset=['5D %', '10D %', '50D %', '150D %']), hide_index=True)
-
-        # Plot input commodities
-        st.write("**Input Commodity Prices**")
-        fig_inputs = go.Figure()
-
-        if aggregate_items and len(ticker_data['inputs']) > 1:
-            # Create aggregated index for all inputs
-            aggregated_data = create_aggregated_index(ticker_data['inputs'], df, all_indexes, regional_indexes)
-            if aggregated_data is not None and not aggregated_data.empty:
-                # Normalize using first valid price
-                first_valid_price = aggregated_data['Price'].dropna().iloc[0] if aggregated_data['Price'].notna().any() else None
-                if first_valid_price:
-                    aggregated_data['Normalized'] = (aggregated_data['Price'] / first_valid_price) * 100
-
-                    fig_inputs.add_trace(go.Scatter(
-                        x=aggregated_data['Date'],
-                        y=aggregated_data['Normalized'],
-                        mode='lines',
-                        name='Aggregated Input Index',
-                        line=dict(width=2)
-                    ))
-        else:
-            # Show individual items
-            for inp in ticker_data['inputs']:
-                item_data, display_name = get_index_data(inp['item'], inp['group'], inp['region'], df, all_indexes, regional_indexes)
-                if item_data is not None and not item_data.empty:
-                    # Normalize to base 100 using first valid price
-                    first_valid_price = item_data['Price'].dropna().iloc[0] if item_data['Price'].notna().any() else None
-                    if first_valid_price:
-                        item_data['Normalized'] = (item_data['Price'] / first_valid_price) * 100
-
-                        fig_inputs.add_trace(go.Scatter(
-                            x=item_data['Date'],
-                            y=item_data['Normalized'],
-                            mode='lines',
-                            name=display_name,
-                            line=dict(width=2)
-                        ))
-
-        fig_inputs.update_layout(
-            xaxis_title='Date',
-            yaxis_title='Normalized Price (Base = 100)',
-            hovermode='x unified',
-            template='plotly_white',
-            height=400,
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=1.02,
-                xanchor='center',
-                x=0.5,
-                font=dict(size=12)
-            )
-        )
-        st.plotly_chart(fig_inputs, use_container_width=True, key="input_chart")
+        render_commodity_side(ticker_data['inputs'], 'Input', input_index, name_prices, all_indexes, regional_indexes, aggregate_items)
     else:
         st.info('No input commodities mapped')
 
@@ -562,119 +609,7 @@ if ticker_data:
     """, unsafe_allow_html=True)
 
     if ticker_data['outputs']:
-        output_items = []
-
-        # Check if aggregation is enabled and multiple outputs exist
-        if aggregate_items and len(ticker_data['outputs']) > 1:
-            aggregated_data = create_aggregated_index(ticker_data['outputs'], df, all_indexes, regional_indexes)
-            if aggregated_data is not None and not aggregated_data.empty:
-                aggregated_data = aggregated_data.sort_values('Date').reset_index(drop=True)
-                latest_price = aggregated_data['Price'].iloc[-1]
-
-                pct_5d = ((latest_price - aggregated_data['Price'].iloc[-6]) / aggregated_data['Price'].iloc[-6] * 100) if len(aggregated_data) > 5 else None
-                pct_10d = ((latest_price - aggregated_data['Price'].iloc[-11]) / aggregated_data['Price'].iloc[-11] * 100) if len(aggregated_data) > 10 else None
-                pct_50d = ((latest_price - aggregated_data['Price'].iloc[-51]) / aggregated_data['Price'].iloc[-51] * 100) if len(aggregated_data) > 50 else None
-                pct_150d = ((latest_price - aggregated_data['Price'].iloc[-151]) / aggregated_data['Price'].iloc[-151] * 100) if len(aggregated_data) > 150 else None
-
-                output_items.append({
-                    'Data Source': 'Aggregated Output Index',
-                    '5D %': pct_5d,
-                    '10D %': pct_10d,
-                    '50D %': pct_50d,
-                    '150D %': pct_150d
-                })
-        else:
-            for out in ticker_data['outputs']:
-                item_data, actual_name = get_index_data(out['item'], out['group'], out['region'], df, all_indexes, regional_indexes)
-
-                if item_data is not None and not item_data.empty:
-                    item_data = item_data.sort_values('Date').reset_index(drop=True)
-                    latest_price = item_data['Price'].iloc[-1]
-
-                    pct_5d = ((latest_price - item_data['Price'].iloc[-6]) / item_data['Price'].iloc[-6] * 100) if len(item_data) > 5 else None
-                    pct_10d = ((latest_price - item_data['Price'].iloc[-11]) / item_data['Price'].iloc[-11] * 100) if len(item_data) > 10 else None
-                    pct_50d = ((latest_price - item_data['Price'].iloc[-51]) / item_data['Price'].iloc[-51] * 100) if len(item_data) > 50 else None
-                    pct_150d = ((latest_price - item_data['Price'].iloc[-151]) / item_data['Price'].iloc[-151] * 100) if len(item_data) > 150 else None
-                else:
-                    pct_5d = pct_10d = pct_50d = pct_150d = None
-
-                output_items.append({
-                    'Data Source': actual_name if actual_name else 'N/A',
-                    '5D %': pct_5d,
-                    '10D %': pct_10d,
-                    '50D %': pct_50d,
-                    '150D %': pct_150d
-                })
-
-        output_df = pd.DataFrame(output_items)
-
-        def color_output(val):
-            # For outputs: positive = green (revenue up), negative = red (revenue down)
-            if val is None or pd.isna(val):
-                return ''
-            return 'color: green' if val > 0 else 'color: red' if val < 0 else ''
-
-        st.dataframe(output_df.style.format({
-            '5D %': '{:.2f}',
-            '10D %': '{:.2f}',
-            '50D %': '{:.2f}',
-            '150D %': '{:.2f}'
-        }, na_rep='-').map(color_output, subset=['5D %', '10D %', '50D %', '150D %']), hide_index=True)
-
-        # Plot output commodities
-        st.write("**Output Commodity Prices**")
-        fig_outputs = go.Figure()
-
-        if aggregate_items and len(ticker_data['outputs']) > 1:
-            # Create aggregated index for all outputs
-            aggregated_data = create_aggregated_index(ticker_data['outputs'], df, all_indexes, regional_indexes)
-            if aggregated_data is not None and not aggregated_data.empty:
-                # Normalize using first valid price
-                first_valid_price = aggregated_data['Price'].dropna().iloc[0] if aggregated_data['Price'].notna().any() else None
-                if first_valid_price:
-                    aggregated_data['Normalized'] = (aggregated_data['Price'] / first_valid_price) * 100
-
-                    fig_outputs.add_trace(go.Scatter(
-                        x=aggregated_data['Date'],
-                        y=aggregated_data['Normalized'],
-                        mode='lines',
-                        name='Aggregated Output Index',
-                        line=dict(width=2)
-                    ))
-        else:
-            # Show individual items
-            for out in ticker_data['outputs']:
-                item_data, display_name = get_index_data(out['item'], out['group'], out['region'], df, all_indexes, regional_indexes)
-                if item_data is not None and not item_data.empty:
-                    # Normalize to base 100 using first valid price
-                    first_valid_price = item_data['Price'].dropna().iloc[0] if item_data['Price'].notna().any() else None
-                    if first_valid_price:
-                        item_data['Normalized'] = (item_data['Price'] / first_valid_price) * 100
-
-                        fig_outputs.add_trace(go.Scatter(
-                            x=item_data['Date'],
-                            y=item_data['Normalized'],
-                            mode='lines',
-                            name=display_name,
-                            line=dict(width=2)
-                        ))
-
-        fig_outputs.update_layout(
-            xaxis_title='Date',
-            yaxis_title='Normalized Price (Base = 100)',
-            hovermode='x unified',
-            template='plotly_white',
-            height=400,
-            legend=dict(
-                orientation='h',
-                yanchor='bottom',
-                y=1.02,
-                xanchor='center',
-                x=0.5,
-                font=dict(size=12)
-            )
-        )
-        st.plotly_chart(fig_outputs, use_container_width=True, key="output_chart")
+        render_commodity_side(ticker_data['outputs'], 'Output', output_index, name_prices, all_indexes, regional_indexes, aggregate_items)
     else:
         st.info('No output commodities mapped')
 
@@ -689,6 +624,8 @@ if ticker_data:
         """, unsafe_allow_html=True)
 
         # Create subplots - 3 rows, shared x-axis
+        # Traces get float32 arrays like the Group Analysis charts: Plotly serializes NumPy arrays
+        # as typed binary buffers, so float32 halves the payload of this 3-subplot figure
         fig_combined = make_subplots(
             rows=3, cols=1,
             shared_xaxes=True,
@@ -703,60 +640,42 @@ if ticker_data:
         output_normalized = None
 
         # Add inputs to top subplot - always aggregate
-        if ticker_data['inputs']:
-            if len(ticker_data['inputs']) > 1:
-                aggregated_data = create_aggregated_index(ticker_data['inputs'], df, all_indexes, regional_indexes)
-                input_label = '[IN] Aggregated Input Index'
-            else:
-                # Single input - use directly
-                inp = ticker_data['inputs'][0]
-                aggregated_data, display_name = get_index_data(inp['item'], inp['group'], inp['region'], df, all_indexes, regional_indexes)
-                input_label = f"[IN] {display_name}"
-
-            if aggregated_data is not None and not aggregated_data.empty:
-                if 'Index_Value' in aggregated_data.columns:
-                    aggregated_data = aggregated_data.rename(columns={'Index_Value': 'Price'})
-                # Normalize using first valid price
-                first_valid_price = aggregated_data['Price'].dropna().iloc[0] if aggregated_data['Price'].notna().any() else None
-                if first_valid_price:
-                    aggregated_data['Normalized'] = (aggregated_data['Price'] / first_valid_price) * 100
-                    input_normalized = aggregated_data[['Date', 'Normalized']].copy()
+        if input_index is not None and not input_index.empty:
+            input_label = f"[IN] {input_name}" if input_name else '[IN] Aggregated Input Index'
+            # Normalize using first valid price
+            normalized = normalize_to_base(input_index['Price'].to_numpy(dtype='float64', na_value=np.nan))
+            if normalized is not None:
+                input_normalized = pd.DataFrame({
+                    'Date': input_index['Date'].to_numpy(),
+                    'Normalized': normalized
+                })
 
-                    fig_combined.add_trace(go.Scatter(
-                        x=aggregated_data['Date'],
-                        y=aggregated_data['Normalized'],
-                        mode='lines',
-                        name=input_label,
-                        line=dict(dash='dot', width=2)
-                    ), row=1, col=1)
+                fig_combined.add_trace(go.Scattergl(
+                    x=input_normalized['Date'].to_numpy(),
+                    y=input_normalized['Normalized'].to_numpy(dtype='float32'),
+                    mode='lines',
+                    name=input_label,
+                    line=dict(dash='dot', width=2)
+                ), row=1, col=1)
 
         # Add outputs to top subplot - always aggregate
-        if ticker_data['outputs']:
-            if len(ticker_data['outputs']) > 1:
-                aggregated_data = create_aggregated_index(ticker_data['outputs'], df, all_indexes, regional_indexes)
-                output_label = '[OUT] Aggregated Output Index'
-            else:
-                # Single output - use directly
-                out = ticker_data['outputs'][0]
-                aggregated_data, display_name = get_index_data(out['item'], out['group'], out['region'], df, all_indexes, regional_indexes)
-                output_label = f"[OUT] {display_name}"
-
-            if aggregated_data is not None and not aggregated_data.empty:
-                if 'Index_Value' in aggregated_data.columns:
-                    aggregated_data = aggregated_data.rename(columns={'Index_Value': 'Price'})
-                # Normalize using first valid price
-                first_valid_price = aggregated_data['Price'].dropna().iloc[0] if aggregated_data['Price'].notna().any() else None
-                if first_valid_price:
-                    aggregated_data['Normalized'] = (aggregated_data['Price'] / first_valid_price) * 100
-                    output_normalized = aggregated_data[['Date', 'Normalized']].copy()
+        if output_index is not None and not output_index.empty:
+            output_label = f"[OUT] {output_name}" if output_name else '[OUT] Aggregated Output Index'
+            # Normalize using first valid price
+            normalized = normalize_to_base(output_index['Price'].to_numpy(dtype='float64', na_value=np.nan))
+            if normalized is not None:
+                output_normalized = pd.DataFrame({
+                    'Date': output_index['Date'].to_numpy(),
+                    'Normalized': normalized
+                })
 
-                    fig_combined.add_trace(go.Scatter(
-                        x=aggregated_data['Date'],
-                        y=aggregated_data['Normalized'],
-                        mode='lines',
-                        name=output_label,
-                        line=dict(width=2)
-                    ), row=1, col=1)
+                fig_combined.add_trace(go.Scattergl(
+                    x=output_normalized['Date'].to_numpy(),
+                    y=output_normalized['Normalized'].to_numpy(dtype='float32'),
+                    mode='lines',
+                    name=output_label,
+                    line=dict(width=2)
+                ), row=1, col=1)
 
         # Handle missing inputs/outputs by treating as flat line at base 100 (0% change)
         # This matches the summary table logic where None = 0%
@@ -780,72 +699,53 @@ if ticker_data:
             )
 
             if not merged_spread.empty:
-                # Split into positive and negative spread segments
+                # Positive and negative spread regions as NaN-masked series: Plotly breaks lines and
+                # fills at NaN, so four traces draw every segment instead of two traces per segment
                 merged_spread['Spread'] = merged_spread['Output'] - merged_spread['Input']
-                merged_spread['Sign'] = (merged_spread['Spread'] >= 0).astype(int)
-                merged_spread['Group'] = (merged_spread['Sign'] != merged_spread['Sign'].shift()).cumsum()
-
-                # Plot each continuous segment
-                for group_id in merged_spread['Group'].unique():
-                    segment = merged_spread[merged_spread['Group'] == group_id].copy()
-
-                    if segment['Spread'].iloc[0] >= 0:
-                        # Positive spread - blue
-                        fig_combined.add_trace(go.Scatter(
-                            x=segment['Date'],
-                            y=segment['Output'],
-                            mode='lines',
-                            line=dict(width=0),
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ), row=1, col=1)
-
-                        fig_combined.add_trace(go.Scatter(
-                            x=segment['Date'],
-                            y=segment['Input'],
-                            mode='lines',
-                            line=dict(width=0),
-                            fill='tonexty',
-                            fillcolor='rgba(0, 176, 246, 0.2)',
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ), row=1, col=1)
-                    else:
-                        # Negative spread - red
-                        fig_combined.add_trace(go.Scatter(
-                            x=segment['Date'],
-                            y=segment['Input'],
-                            mode='lines',
-                            line=dict(width=0),
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ), row=1, col=1)
-
-                        fig_combined.add_trace(go.Scatter(
-                            x=segment['Date'],
-                            y=segment['Output'],
-                            mode='lines',
-                            line=dict(width=0),
-                            fill='tonexty',
-                            fillcolor='rgba(255, 0, 0, 0.2)',
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ), row=1, col=1)
+                positive = merged_spread['Spread'] >= 0
+
+                # Line traces are WebGL (Scattergl); the fills stay SVG Scatter since Scattergl
+                # does not render fill='tonexty' reliably
+                # (base trace, filled trace, mask, fill colour) - blue where output is at or above input
+                fill_regions = [
+                    ('Output', 'Input', positive, 'rgba(0, 176, 246, 0.2)'),
+                    ('Input', 'Output', ~positive, 'rgba(255, 0, 0, 0.2)')
+                ]
+                for base_col, fill_col, mask, fill_color in fill_regions:
+                    fig_combined.add_trace(go.Scatter(
+                        x=merged_spread['Date'].to_numpy(),
+                        y=merged_spread[base_col].where(mask).to_numpy(dtype='float32'),
+                        mode='lines',
+                        line=dict(width=0),
+                        showlegend=False,
+                        hoverinfo='skip'
+                    ), row=1, col=1)
+
+                    fig_combined.add_trace(go.Scatter(
+                        x=merged_spread['Date'].to_numpy(),
+                        y=merged_spread[fill_col].where(mask).to_numpy(dtype='float32'),
+                        mode='lines',
+                        line=dict(width=0),
+                        fill='tonexty',
+                        fillcolor=fill_color,
+                        showlegend=False,
+                        hoverinfo='skip'
+                    ), row=1, col=1)
 
         # Add spread line to 2nd subplot
         spread_data = None
         if input_normalized is not None and output_normalized is not None:
             if not merged_spread.empty:
-                merged_spread['Spread'] = merged_spread['Output'] - merged_spread['Input']
+                # Spread was computed above for the shading
                 merged_spread['Spread_MA20'] = merged_spread['Spread'].rolling(window=20, min_periods=1).mean()
 
                 # Save for correlation calculation
-                spread_data = merged_spread[['Date', 'Spread', 'Spread_MA20']].copy()
+                spread_data = merged_spread[['Date', 'Spread', 'Spread_MA20']]
 
                 # Add raw spread line (thin, transparent)
-                fig_combined.add_trace(go.Scatter(
-                    x=merged_spread['Date'],
-                    y=merged_spread['Spread'],
+                fig_combined.add_trace(go.Scattergl(
+                    x=merged_spread['Date'].to_numpy(),
+                    y=merged_spread['Spread'].to_numpy(dtype='float32'),
                     mode='lines',
                     name='Spread (Daily)',
                     line=dict(color='lightgreen', width=1),
@@ -854,8 +754,8 @@ if ticker_data:
 
                 # Add MA20 spread line (main)
                 fig_combined.add_trace(go.Scatter(
-                    x=merged_spread['Date'],
-                    y=merged_spread['Spread_MA20'],
+                    x=merged_spread['Date'].to_numpy(),
+                    y=merged_spread['Spread_MA20'].to_numpy(dtype='float32'),
                     mode='lines',
                     name='Spread MA20',
                     line=dict(color='green', width=2),
@@ -867,39 +767,42 @@ if ticker_data:
                 fig_combined.add_hline(y=0, line=dict(color='gray', dash='dash', width=1), row=2, col=1)
 
         # Add stock price to 3rd subplot
-        stock_data = fetch_historical_price(selected_ticker, start_date=start_date.strftime('%Y-%m-%d'))
+        stock_data = fetch_stock_price_cached(selected_ticker, start_date.strftime('%Y-%m-%d'))
         if stock_data is not None and not stock_data.empty:
-            stock_data = stock_data.sort_values('Date').reset_index(drop=True)
-            stock_data['Normalized'] = (stock_data['Price'] / stock_data['Price'].iloc[0]) * 100
-
-            fig_combined.add_trace(go.Scatter(
-                x=stock_data['Date'],
-                y=stock_data['Normalized'],
-                mode='lines',
-                name=f'[STOCK] {selected_ticker}',
-                line=dict(color='black', width=2)
-            ), row=3, col=1)
-
-            # Calculate correlations
-            price_correlations, return_correlations = calculate_correlations(selected_ticker, ticker_data, df, all_indexes, regional_indexes, stock_data)
+            stock_normalized = normalize_to_base(stock_data['Price'].to_numpy(dtype='float64', na_value=np.nan))
+            if stock_normalized is not None:
+                fig_combined.add_trace(go.Scattergl(
+                    x=stock_data['Date'].to_numpy(),
+                    y=stock_normalized.astype('float32'),
+                    mode='lines',
+                    name=f'[STOCK] {selected_ticker}',
+                    line=dict(color='black', width=2)
+                ), row=3, col=1)
+
+            # Correlations for the selected ticker only (cached per ticker and timeframe), reusing the cached stock fetch
+            price_correlations, return_correlations = calculate_correlations(
+                selected_ticker, df_version, start_date.strftime('%Y-%m-%d'),
+                ticker_data, name_prices, all_indexes, regional_indexes, stock_data
+            )
 
         # Calculate spread correlation with stock price
         spread_correlation = None
         spread_return_correlation = None
         if stock_data is not None and spread_data is not None:
-            stock_df = stock_data[['Date', 'Price']].copy()
-            stock_df['Date'] = pd.to_datetime(stock_df['Date']).dt.tz_localize(None)
-            spread_data['Date'] = pd.to_datetime(spread_data['Date']).dt.tz_localize(None)
+            stock_df = stock_data[['Date', 'Price']]
 
             merged_corr = pd.merge(stock_df, spread_data, on='Date', how='inner')
             if len(merged_corr) > 1:
-                # Price level correlation (stock price vs spread MA20)
-                spread_correlation = merged_corr['Price'].corr(merged_corr['Spread_MA20'])
-
-                # Returns correlation
-                merged_corr['Stock_Return'] = merged_corr['Price'].pct_change(fill_method=None)
-                merged_corr['Spread_Change'] = merged_corr['Spread_MA20'].pct_change(fill_method=None)
-                spread_return_correlation = merged_corr['Stock_Return'].corr(merged_corr['Spread_Change'])
+                prices = merged_corr['Price'].to_numpy(dtype='float64')
+                spread_ma = merged_corr['Spread_MA20'].to_numpy(dtype='float64')
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    stock_returns = np.r_[np.nan, prices[1:] / prices[:-1] - 1]
+                    spread_changes = np.r_[np.nan, spread_ma[1:] / spread_ma[:-1] - 1]
+
+                # Price level (stock price vs spread MA20) and returns correlations in one pass
+                x = np.column_stack([prices, stock_returns])
+                y = np.column_stack([spread_ma, spread_changes])
+                spread_correlation, spread_return_correlation = _masked_pearson(x, y, ~np.isnan(x) & ~np.isnan(y))
 
         # Update layout
         fig_combined.update_xaxes(title_text='Date', row=3, col=1)
@@ -2,6 +2,9 @@ import streamlit as st
 
 st.set_page_config(layout="wide", initial_sidebar_state="expanded", page_title="Market News Summary")
 
+# Single-pass translation table for escaping markdown special characters
+MARKDOWN_ESCAPE = str.maketrans({'$': r'\$', '~': r'\~'})
+
 # Force light theme
 st.markdown("""
     <style>
@@ -265,25 +268,22 @@ with tab2:
 
             # Initialize variables
             report_options = []
-            selected_display = None
+            selected_idx = None
 
             if filtered_reports:
-                # Sort by date (newest first)
-                filtered_reports.sort(key=lambda x: x.get('report_date', ''), reverse=True)
-
-                # Create display list
-                for report in filtered_reports:
-                    date = report.get('report_date', 'Unknown')
-                    source = report.get('report_source', 'Unknown')
-                    series = report.get('report_series', 'Unknown')
-                    display_text = f"{date} - {source}"
-                    report_options.append(display_text)
-
-                # Report selection
+                # Reports already arrive newest first (load_reports sorts on report_date in MongoDB),
+                # so build the display labels in a single pass without re-sorting
+                report_options = [
+                    f"{report.get('report_date', 'Unknown')} - {report.get('report_source', 'Unknown')}"
+                    for report in filtered_reports
+                ]
+
+                # Report selection (by position, so no label lookup is needed afterwards)
                 st.markdown("**Select Report:**")
-                selected_display = st.radio(
+                selected_idx = st.radio(
                     'Available Reports',
-                    options=report_options,
+                    options=range(len(report_options)),
+                    format_func=report_options.__getitem__,
                     index=0,
                     label_visibility="collapsed"
                 )
@@ -295,12 +295,11 @@ with tab2:
                 st.caption(f"Total: {len(reports_data)}")
 
         with content_col:
-            if not filtered_reports or not selected_display:
+            if not filtered_reports or selected_idx is None:
                 st.warning('No reports match the selected filters.')
                 st.info('Try adjusting your filter selections.')
             else:
                 # Get selected report
-                selected_idx = report_options.index(selected_display)
                 selected_report = filtered_reports[selected_idx]
 
                 # Display report metadata
@@ -332,9 +331,7 @@ with tab2:
                         if news.strip():
                             st.markdown(f"### {commodity}")
                             # Escape markdown special characters
-                            news_escaped = news.replace('$', r'\$')
-                            news_escaped = news_escaped.replace('~', r'\~')
-                            st.markdown(news_escaped)
+                            st.markdown(news.translate(MARKDOWN_ESCAPE))
                             st.markdown("---")
                 else:
                     st.info('No commodity news available for this report.')
@@ -1,6 +1,7 @@
 import streamlit as st
 import sys
 import os
+import asyncio
 
 # Add parent directory to path for imports
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,15 +12,8 @@ xai_api_dir = os.path.join(parent_dir, "xai_api")
 sys.path.append(xai_api_dir)
 
 # Import utilities
-from mongodb_utils import get_catalyst, get_catalyst_history, save_catalyst, can_auto_trigger, load_commodity_classifications
-from catalyst_search import search_catalysts, MODEL
-
-# Import batch search functions
-try:
-    from intelligent_batch_search import load_commodity_data, calculate_group_movements, determine_search_params
-    BATCH_SEARCH_AVAILABLE = True
-except ImportError:
-    BATCH_SEARCH_AVAILABLE = False
+from mongodb_utils import get_catalyst, get_catalyst_history, save_catalyst, save_catalysts_bulk, can_auto_trigger, bulk_cooldown_status, load_commodity_classifications
+from catalyst_search import search_catalysts, cached_search_catalysts, MODEL
 
 st.set_page_config(layout="wide", page_title="Catalyst Search Admin")
 
@@ -67,17 +61,77 @@ st.title('Catalyst Search Admin')
 st.markdown("*View and manage commodity price catalysts from X (Twitter)*")
 st.caption(f"Model: {MODEL}")
 
+# Gradient header style
+def gradient_header(text, font_size=18):
+    st.markdown(f"""
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    padding: 1px 12px; border-radius: 8px; margin-bottom: 12px;">
+            <h3 style="color: white; margin: 0; font-size: {font_size}px;">{text}</h3>
+        </div>
+    """, unsafe_allow_html=True)
+
+async def run_batch_searches(jobs, concurrency, delay_seconds, progress_bar, status_text, force_refresh=False):
+    """Run cached_search_catalysts for each job in worker threads, at most `concurrency` in flight
+    and request starts spaced `delay_seconds` apart. Returns (job, result or exception) pairs."""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    start_lock = asyncio.Lock()
+    next_start = loop.time()
+
+    async def run_one(job):
+        nonlocal next_start
+        async with semaphore:
+            # Space out request starts to stay under the API rate limit
+            async with start_lock:
+                wait = next_start - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                next_start = loop.time() + delay_seconds
+
+            try:
+                result = await asyncio.to_thread(
+                    cached_search_catalysts,
+                    commodity_group=job["group"],
+                    lookback_days=job["lookback_days"],
+                    direction=job["search_direction"],
+                    force_refresh=force_refresh
+                )
+            except Exception as e:
+                result = e
+            return job, result
+
+    tasks = [asyncio.create_task(run_one(job)) for job in jobs]
+    completed = []
+    # At most ~50 progress refreshes, always including the final 100%
+    step = max(1, len(jobs) // 50)
+
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        job, result = await task
+        completed.append((job, result))
+
+        if done % step == 0 or done == len(jobs):
+            progress_bar.progress(done / len(jobs))
+            status_text.text(f"[{done}/{len(jobs)}] Finished {job['group']}")
+
+    return completed
+
+@st.cache_resource
+def load_batch_search_module():
+    """
+    Import batch search functions on first use of the Batch Search tab.
+    Raises ImportError if unavailable - exceptions are not cached, so the next rerun retries.
+    """
+    import intelligent_batch_search
+    return intelligent_batch_search
+
 # ===== Load Commodity Groups =====
 
-@st.cache_data(ttl=60)
+@st.cache_data(ttl=600)  # Groups rarely change; 10 min keeps MongoDB hits low
 def load_commodity_groups():
     """Load all commodity groups from MongoDB classifications"""
     try:
-        classifications = load_commodity_classifications()
-        if classifications:
-            groups = [c.get('group') for c in classifications if c.get('group')]
-            return sorted(set(groups))
-        return []
+        classifications = load_commodity_classifications() or ()
+        return sorted({c['group'] for c in classifications if c.get('group')})
     except Exception as e:
         st.error(f"Error loading commodity groups: {e}")
         return []
@@ -86,12 +140,7 @@ commodity_groups = load_commodity_groups()
 
 # ===== Shared Configuration =====
 
-st.markdown("""
-    <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                padding: 1px 12px; border-radius: 8px; margin-bottom: 12px;">
-        <h3 style="color: white; margin: 0; font-size: 16px;">Configuration</h3>
-    </div>
-""", unsafe_allow_html=True)
+gradient_header("Configuration", font_size=16)
 
 threshold = st.number_input(
     "Movement Threshold (%) - Used by Batch Search",
@@ -128,12 +177,7 @@ st.divider()
 # Render active tab content
 if st.session_state.active_tab == "Individual Search":
     # ===== TAB 1: Individual Search =====
-    st.markdown("""
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    padding: 1px 12px; border-radius: 8px; margin-bottom: 12px;">
-            <h3 style="color: white; margin: 0; font-size: 18px;">Step 1: Select Commodity</h3>
-        </div>
-    """, unsafe_allow_html=True)
+    gradient_header("Step 1: Select Commodity")
 
     selected_commodity = st.selectbox(
         "Commodity Group",
@@ -145,12 +189,7 @@ if st.session_state.active_tab == "Individual Search":
 
     # ===== Step 2: View Saved Catalyst =====
 
-    st.markdown("""
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    padding: 1px 12px; border-radius: 8px; margin-bottom: 12px;">
-            <h3 style="color: white; margin: 0; font-size: 18px;">Step 2: Saved Catalyst (from Database)</h3>
-        </div>
-    """, unsafe_allow_html=True)
+    gradient_header("Step 2: Saved Catalyst (from Database)")
 
     if selected_commodity:
         # Get latest catalyst
@@ -175,15 +214,22 @@ if st.session_state.active_tab == "Individual Search":
                     st.markdown(f"• **{date}**:")
                     st.text(event)
 
-            # Show history if available
-            history = get_catalyst_history(selected_commodity, limit=10)
-            if len(history) > 1:
-                with st.expander(f"📜 View History ({len(history) - 1} previous searches)"):
-                    for catalyst in history[1:]:
-                        st.markdown(f"**{catalyst.get('search_date', 'Unknown')}** "
-                                  f"({catalyst.get('search_trigger', 'Unknown')})")
-                        st.text(catalyst.get('summary', 'No summary'))
-                        st.divider()
+            # Show history only on request (skips a MongoDB query on every rerun)
+            if st.session_state.get('history_commodity') != selected_commodity:
+                if st.button("📜 Load History"):
+                    st.session_state.history_commodity = selected_commodity
+                    st.rerun()
+            else:
+                history = get_catalyst_history(selected_commodity, limit=10)
+                if len(history) > 1:
+                    with st.expander(f"📜 View History ({len(history) - 1} previous searches)", expanded=True):
+                        for catalyst in history[1:]:
+                            st.markdown(f"**{catalyst.get('search_date', 'Unknown')}** "
+                                      f"({catalyst.get('search_trigger', 'Unknown')})")
+                            st.text(catalyst.get('summary', 'No summary'))
+                            st.divider()
+                else:
+                    st.caption("No previous searches")
         else:
             st.info(f"No saved catalyst found for {selected_commodity}. Run a search below to create one.")
     else:
@@ -193,12 +239,7 @@ if st.session_state.active_tab == "Individual Search":
 
     # ===== Step 3: Run New Search =====
 
-    st.markdown("""
-        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    padding: 1px 12px; border-radius: 8px; margin-bottom: 12px;">
-            <h3 style="color: white; margin: 0; font-size: 18px;">Step 3: Run New Search (X API)</h3>
-        </div>
-    """, unsafe_allow_html=True)
+    gradient_header("Step 3: Run New Search (X API)")
 
     st.markdown("⚠️ **This will query X (Twitter) via API** (~30 seconds)")
 
@@ -270,12 +311,7 @@ if st.session_state.active_tab == "Individual Search":
             st.code(results.get("raw_response", "No response"), language="text")
         else:
             # Display results
-            st.markdown("""
-                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                            padding: 1px 12px; border-radius: 8px; margin-bottom: 12px;">
-                    <h3 style="color: white; margin: 0; font-size: 18px;">Search Results</h3>
-                </div>
-            """, unsafe_allow_html=True)
+            gradient_header("Search Results")
 
             # Summary
             summary = results.get("summary", "No summary available")
@@ -313,8 +349,7 @@ if st.session_state.active_tab == "Individual Search":
 
                 if success:
                     st.success(f"✅ Catalyst saved for {st.session_state.search_commodity}!\n\nℹ️ Changes will appear on Dashboard within ~60 seconds.")
-                    # Clear cache to force refresh
-                    st.cache_data.clear()
+                    # save_catalyst clears only the catalyst cache (SQL price and other caches stay warm)
                     # Clear search results after successful save
                     st.session_state.search_results = None
                     st.rerun()
@@ -323,15 +358,16 @@ if st.session_state.active_tab == "Individual Search":
 
 else:
     # ===== TAB 2: Batch Search =====
-    if not BATCH_SEARCH_AVAILABLE:
+    # Imported lazily so the Individual Search tab doesn't pay for it
+    try:
+        batch_search = load_batch_search_module()
+    except ImportError:
+        batch_search = None
+
+    if batch_search is None:
         st.error("❌ Batch search module not available. Check intelligent_batch_search.py")
     else:
-        st.markdown("""
-            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                        padding: 1px 12px; border-radius: 8px; margin-bottom: 12px;">
-                <h3 style="color: white; margin: 0; font-size: 18px;">Intelligent Batch Search</h3>
-            </div>
-        """, unsafe_allow_html=True)
+        gradient_header("Intelligent Batch Search")
 
         st.markdown("**Automatically determines search parameters based on price movements:**")
         st.markdown("""
@@ -352,10 +388,22 @@ else:
             min_value=3,
             max_value=30,
             value=5,
-            help="Delay between API calls to avoid rate limits"
+            help="Minimum spacing between API call starts to avoid rate limits"
+        )
+        concurrency = st.number_input(
+            "Concurrent Searches",
+            min_value=1,
+            max_value=8,
+            value=4,
+            help="Maximum number of X API searches in flight at once"
         )
 
         check_cooldown = st.checkbox("Check cooldown periods (skip groups in cooldown)", value=True)
+        force_refresh = st.checkbox(
+            "Force refresh (ignore today's cached search results)",
+            value=False,
+            help="Searches with the same group, lookback and direction are cached for the day"
+        )
 
         st.divider()
 
@@ -370,23 +418,22 @@ else:
             with st.spinner("Loading commodity data and calculating movements..."):
                 try:
                     # Load data
-                    df = load_commodity_data()
+                    df = batch_search.load_commodity_data()
 
                     # Calculate movements
-                    movements = calculate_group_movements(df)
+                    movements = batch_search.calculate_group_movements(df)
 
                     # Determine search parameters
-                    movements['Direction'], movements['Lookback_Days'], movements['Reason'] = zip(
-                        *movements.apply(lambda row: determine_search_params(row, threshold), axis=1)
-                    )
+                    movements = batch_search.assign_search_params(movements, threshold)
 
                     # Check cooldown status for each group
                     if check_cooldown:
-                        cooldown_status = []
-                        for group in movements['Group']:
-                            can_trigger, msg = can_auto_trigger(group)
-                            cooldown_status.append("✅ Ready" if can_trigger else f"⏳ {msg}")
-                        movements['Cooldown_Status'] = cooldown_status
+                        # One MongoDB query for all groups instead of one per group
+                        cooldowns = bulk_cooldown_status(movements['Group'].tolist())
+                        movements['Cooldown_Ready'] = movements['Group'].map(lambda g: cooldowns[g][0])
+                        movements['Cooldown_Status'] = movements['Group'].map(
+                            lambda g: "✅ Ready" if cooldowns[g][0] else f"⏳ {cooldowns[g][1]}"
+                        )
 
                     # Store in session state
                     st.session_state.batch_movements = movements
@@ -403,12 +450,9 @@ else:
             st.markdown("---")
             st.markdown(f"**Analysis Results ({len(movements)} groups):**")
 
-            # Format display dataframe
+            # Format display dataframe (rename already returns a new frame, no copy needed)
             display_df = movements[['Group', '5D_Change', '10D_Change', 'Direction', 'Lookback_Days'] +
-                                    (['Cooldown_Status'] if 'Cooldown_Status' in movements.columns else [])].copy()
-
-            # Rename columns for display
-            display_df = display_df.rename(columns={
+                                    (['Cooldown_Status'] if 'Cooldown_Status' in movements.columns else [])].rename(columns={
                 '5D_Change': '5D Change (%)',
                 '10D_Change': '10D Change (%)',
                 'Lookback_Days': 'Lookback (Days)',
@@ -416,47 +460,46 @@ else:
             })
 
             # Format percentages
-            display_df['5D Change (%)'] = display_df['5D Change (%)'].apply(lambda x: f"{x:+.1f}")
-            display_df['10D Change (%)'] = display_df['10D Change (%)'].apply(lambda x: f"{x:+.1f}")
-
-            # Color code by direction
-            def highlight_direction(row):
-                if row['Direction'] == 'bullish':
-                    return ['background-color: #d4edda'] * len(row)
-                elif row['Direction'] == 'bearish':
-                    return ['background-color: #f8d7da'] * len(row)
-                else:
-                    return ['background-color: #fff3cd'] * len(row)
+            display_df['5D Change (%)'] = display_df['5D Change (%)'].map("{:+.1f}".format)
+            display_df['10D Change (%)'] = display_df['10D Change (%)'].map("{:+.1f}".format)
 
-            # Display table
-            st.dataframe(
-                display_df.style.apply(highlight_direction, axis=1),
-                use_container_width=True,
-                height=400
+            # Color code by direction with an emoji marker instead of a row Styler
+            direction_icons = {'bullish': '🟢', 'bearish': '🔴', 'both': '🟡'}
+            display_df['Direction'] = display_df['Direction'].map(
+                lambda d: f"{direction_icons.get(d, '🟡')} {d}"
             )
 
+            # Display table - static table for typical group counts, scrollable grid for long lists
+            if len(display_df) <= 50:
+                st.table(display_df.set_index('Group'))
+            else:
+                st.dataframe(
+                    display_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    height=400
+                )
+
             # Summary stats
+            direction_counts = movements['Direction'].value_counts()
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                bullish_count = len(movements[movements['Direction'] == 'bullish'])
-                st.metric("Bullish", bullish_count)
+                st.metric("Bullish", int(direction_counts.get('bullish', 0)))
             with col2:
-                bearish_count = len(movements[movements['Direction'] == 'bearish'])
-                st.metric("Bearish", bearish_count)
+                st.metric("Bearish", int(direction_counts.get('bearish', 0)))
             with col3:
-                both_count = len(movements[movements['Direction'] == 'both'])
-                st.metric("Both", both_count)
+                st.metric("Both", int(direction_counts.get('both', 0)))
             with col4:
-                if 'Cooldown_Status' in movements.columns:
-                    ready_count = len([s for s in movements['Cooldown_Status'] if s.startswith('✅')])
+                if 'Cooldown_Ready' in movements.columns:
+                    ready_count = int(movements['Cooldown_Ready'].sum())
                     st.metric("Ready", ready_count)
 
             st.markdown("---")
 
             # Run batch search button
             groups_to_search = movements
-            if check_cooldown and 'Cooldown_Status' in movements.columns:
-                groups_to_search = movements[movements['Cooldown_Status'].str.startswith('✅')]
+            if check_cooldown and 'Cooldown_Ready' in movements.columns:
+                groups_to_search = movements[movements['Cooldown_Ready']]
                 if len(groups_to_search) < len(movements):
                     st.info(f"ℹ️ {len(movements) - len(groups_to_search)} groups will be skipped due to cooldown")
 
@@ -473,64 +516,64 @@ else:
                     status_text = st.empty()
 
                     results = []
-
-                    for idx, (_, row) in enumerate(groups_to_search.iterrows()):
-                        group = row['Group']
-                        direction_val = None if row['Direction'] == 'both' else row['Direction']
-                        lookback_days = int(row['Lookback_Days'])
-
-                        # Update progress
-                        progress = (idx + 1) / len(groups_to_search)
-                        progress_bar.progress(progress)
-                        status_text.text(f"[{idx+1}/{len(groups_to_search)}] Searching {group}...")
-
-                        try:
-                            # Run search
-                            search_result = search_catalysts(
-                                commodity_group=group,
-                                lookback_days=lookback_days,
-                                direction=direction_val
-                            )
-
-                            # Save to MongoDB
-                            if "_meta" in search_result and search_result["_meta"].get("parse_error"):
-                                results.append({
-                                    "group": group,
-                                    "success": False,
-                                    "error": "Parse error"
-                                })
-                            else:
-                                summary = search_result.get("summary", "")
-                                timeline = search_result.get("timeline", [])
-
-                                # Save with direction from analysis
-                                success = save_catalyst(
-                                    commodity_group=group,
-                                    summary=summary,
-                                    timeline=timeline,
-                                    search_trigger="auto",
-                                    direction=row['Direction']
-                                )
-
-                                results.append({
-                                    "group": group,
-                                    "success": success,
-                                    "direction": row['Direction'],
-                                    "lookback_days": lookback_days
-                                })
-
-                            # Delay between searches (except for last one)
-                            if idx < len(groups_to_search) - 1:
-                                import time
-                                time.sleep(delay_seconds)
-
-                        except Exception as e:
+                    pending_catalysts = []
+
+                    rows = groups_to_search[['Group', 'Direction', 'Lookback_Days']].itertuples(index=False, name=None)
+                    jobs = [
+                        {
+                            "group": group,
+                            "direction": direction,
+                            "search_direction": None if direction == 'both' else direction,
+                            "lookback_days": int(lookback_days)
+                        }
+                        for group, direction, lookback_days in rows
+                    ]
+
+                    status_text.text(f"Searching {len(jobs)} groups ({int(concurrency)} at a time)...")
+
+                    # Run searches concurrently (I/O-bound X API calls)
+                    search_outcomes = asyncio.run(run_batch_searches(
+                        jobs, int(concurrency), delay_seconds, progress_bar, status_text, force_refresh
+                    ))
+
+                    for job, search_result in search_outcomes:
+                        if isinstance(search_result, Exception):
+                            results.append({
+                                "group": job["group"],
+                                "success": False,
+                                "error": str(search_result)
+                            })
+                        elif "_meta" in search_result and search_result["_meta"].get("parse_error"):
                             results.append({
-                                "group": group,
+                                "group": job["group"],
                                 "success": False,
-                                "error": str(e)
+                                "error": "Parse error"
+                            })
+                        else:
+                            # Queue for MongoDB (saved in one bulk write below), with direction from analysis
+                            pending_catalysts.append({
+                                "commodity_group": job["group"],
+                                "summary": search_result.get("summary", ""),
+                                "timeline": search_result.get("timeline", []),
+                                "direction": job["direction"],
+                                "lookback_days": job["lookback_days"]
                             })
 
+                    # Save all successful searches in a single round trip
+                    if pending_catalysts:
+                        status_text.text(f"Saving {len(pending_catalysts)} catalysts to MongoDB...")
+                        saved_flags = save_catalysts_bulk(pending_catalysts, search_trigger="auto")
+                        for catalyst, saved in zip(pending_catalysts, saved_flags):
+                            result = {
+                                "group": catalyst["commodity_group"],
+                                "success": saved,
+                                "direction": catalyst["direction"],
+                                "lookback_days": catalyst["lookback_days"]
+                            }
+                            if not saved:
+                                result["error"] = "Failed to save to MongoDB"
+                            results.append(result)
+
                     # Clear progress
                     progress_bar.empty()
                     status_text.empty()
@@ -546,11 +589,8 @@ else:
                             for r in failed:
                                 st.text(f"• {r['group']}: {r.get('error', 'Unknown error')}")
 
-                    # Clear only catalyst cache so new results appear on Dashboard
-                    # Keep SQL price cache (6h) and other caches intact
-                    from mongodb_utils import load_catalysts
-                    if hasattr(load_catalysts, 'clear'):
-                        load_catalysts.clear()
+                    # save_catalysts_bulk already cleared only the catalyst cache;
+                    # SQL price cache (6h) and other caches stay intact
 
                     # Keep batch_movements visible so user can review results
                     # Don't reset state or trigger rerun
@@ -136,8 +136,9 @@ def fetch_commodity_data(
     if schema:
         qualified_table = f"{_format_identifier(schema)}.{qualified_table}"
 
-    # Build query with optional filters
-    query = f"SELECT * FROM {qualified_table}"
+    # Build query with optional filters (only the columns callers use, so
+    # pyodbc doesn't transfer and materialize unused ones)
+    query = f"SELECT Ticker, Sector, Date, Price FROM {qualified_table}"
     where_clauses = []
 
     if sector_filter:
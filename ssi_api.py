@@ -45,7 +45,8 @@ def fetch_historical_price(ticker: str, start_date: str = None) -> pd.DataFrame:
     }
 
     try:
-        response = requests.get(url, params=params, headers=headers)
+        # Bounded wait so a slow or hung TCBS response cannot block the page
+        response = requests.get(url, params=params, headers=headers, timeout=15)
         response.raise_for_status()
         data = response.json()
 
@@ -61,6 +62,10 @@ def fetch_historical_price(ticker: str, start_date: str = None) -> pd.DataFrame:
                 else:
                     df['tradingDate'] = pd.to_datetime(df['tradingDate'], unit='ms')
 
+                # Standardize on naive datetime64 to match commodity dates from SQL
+                if df['tradingDate'].dt.tz is not None:
+                    df['tradingDate'] = df['tradingDate'].dt.tz_localize(None)
+
             # Select relevant columns
             columns_to_keep = ['tradingDate', 'open', 'high', 'low', 'close', 'volume']
             df = df[[col for col in columns_to_keep if col in df.columns]]
@@ -68,6 +73,10 @@ def fetch_historical_price(ticker: str, start_date: str = None) -> pd.DataFrame:
             # Rename for consistency
             df = df.rename(columns={'tradingDate': 'Date', 'close': 'Price'})
 
+            # Sort once here so callers can rely on Date order
+            if 'Date' in df.columns:
+                df = df.sort_values('Date', ignore_index=True)
+
             return df
         else:
             return None
@@ -12,6 +12,9 @@ Usage:
 
 import json
 import os
+import sqlite3
+import time
+from contextlib import closing
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional
@@ -24,6 +27,10 @@ from xai_sdk.tools import x_search
 # Model configuration
 MODEL = "grok-4-1-fast-non-reasoning"
 
+# On-disk cache of search results (one entry per group/lookback/direction/day)
+CACHE_PATH = Path(__file__).parent / ".xai_cache.sqlite"
+CACHE_TTL_SECONDS = 86400
+
 
 def load_api_key_from_env(file_path: str = ".env") -> str:
     """
@@ -176,6 +183,61 @@ def search_catalysts(
 
 
 
+def _open_cache() -> sqlite3.Connection:
+    """Open the search cache (one connection per call, so worker threads never share one)."""
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS searches ("
+        "key TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL)"
+    )
+    return conn
+
+
+def cached_search_catalysts(
+    commodity_group: str,
+    lookback_days: int = 7,
+    direction: Optional[str] = None,
+    api_key: Optional[str] = None,
+    force_refresh: bool = False
+) -> dict:
+    """
+    search_catalysts with a persistent disk cache.
+
+    Results are keyed by (commodity_group, lookback_days, direction, UTC day), so
+    re-running the same batch on the same day skips the X API entirely. Parse
+    errors are never cached. Set force_refresh=True to bypass the cache lookup.
+    """
+    today = datetime.now(timezone.utc).date().isoformat()
+    key = json.dumps([commodity_group, int(lookback_days), direction or "both", today])
+
+    if not force_refresh:
+        try:
+            with closing(_open_cache()) as conn, conn:
+                row = conn.execute(
+                    "SELECT result FROM searches WHERE key = ? AND created > ?",
+                    (key, time.time() - CACHE_TTL_SECONDS)
+                ).fetchone()
+            if row:
+                print(f"💾 Using cached {commodity_group} catalysts ({lookback_days} days)")
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            print(f"⚠️  Warning: Search cache unavailable ({e})")
+
+    result = search_catalysts(commodity_group, lookback_days, direction, api_key)
+
+    if not result.get("_meta", {}).get("parse_error"):
+        try:
+            with closing(_open_cache()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO searches (key, result, created) VALUES (?, ?, ?)",
+                    (key, json.dumps(result), time.time())
+                )
+                conn.execute("DELETE FROM searches WHERE created <= ?", (time.time() - CACHE_TTL_SECONDS,))
+        except sqlite3.Error as e:
+            print(f"⚠️  Warning: Could not write search cache ({e})")
+
+    return result
+
 
 def main():
     parser = argparse.ArgumentParser(
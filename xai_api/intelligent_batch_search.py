@@ -23,6 +23,7 @@ import sys
 import os
 import time
 import argparse
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
@@ -33,7 +34,7 @@ parent_dir = Path(__file__).parent.parent
 sys.path.append(str(parent_dir))
 
 # Import required modules
-from mongodb_utils import load_commodity_classifications, save_catalyst, can_auto_trigger
+from mongodb_utils import load_commodity_classifications, save_catalysts_bulk, can_auto_trigger
 from commo_dashboard import create_equal_weight_index
 from catalyst_search import search_catalysts
 
@@ -147,6 +148,45 @@ def determine_search_params(row: pd.Series, threshold: float = 3.0) -> Tuple[str
     return "both", 14, f"5D: {change_5d:.1f}%, 10D: {change_10d:.1f}% (within ±{threshold}%)"
 
 
+def assign_search_params(movements: pd.DataFrame, threshold: float = 3.0) -> pd.DataFrame:
+    """
+    Vectorized determine_search_params over a whole movements DataFrame.
+
+    Args:
+        movements: DataFrame with 5D_Change and 10D_Change columns
+        threshold: Percentage threshold for significant movement (default: 3.0)
+
+    Returns:
+        Same DataFrame with Direction, Lookback_Days and Reason columns added
+    """
+    c5 = movements['5D_Change'].to_numpy(dtype=float)
+    c10 = movements['10D_Change'].to_numpy(dtype=float)
+
+    # Same precedence as determine_search_params: 5D first, then 10D, else both
+    conditions = [c5 > threshold, c5 < -threshold, c10 > threshold, c10 < -threshold]
+
+    f5 = movements['5D_Change'].map('{:.1f}'.format).to_numpy(dtype=object)
+    f10 = movements['10D_Change'].map('{:.1f}'.format).to_numpy(dtype=object)
+    f10_plus = movements['10D_Change'].map('{:+.1f}'.format).to_numpy(dtype=object)
+    f5_plus = movements['5D_Change'].map('{:+.1f}'.format).to_numpy(dtype=object)
+    prefix_10d = "5D: " + f5 + "%, 10D: "
+
+    movements['Direction'] = np.select(conditions, ['bullish', 'bearish', 'bullish', 'bearish'], default='both')
+    movements['Lookback_Days'] = np.where(conditions[0] | conditions[1], 7, 14)
+    movements['Reason'] = np.select(
+        conditions,
+        [
+            "5D: " + f5_plus + f"% (>{threshold}%)",
+            "5D: " + f5 + f"% (<-{threshold}%)",
+            prefix_10d + f10_plus + f"% (>{threshold}%)",
+            prefix_10d + f10 + f"% (<-{threshold}%)",
+        ],
+        default=prefix_10d + f10 + f"% (within ±{threshold}%)"
+    )
+
+    return movements
+
+
 def run_intelligent_batch_search(
     df: pd.DataFrame,
     threshold: float = 3.0,
@@ -184,9 +224,7 @@ def run_intelligent_batch_search(
         return []
 
     # Determine search parameters for each group
-    movements['Direction'], movements['Lookback_Days'], movements['Reason'] = zip(
-        *movements.apply(lambda row: determine_search_params(row, threshold), axis=1)
-    )
+    movements = assign_search_params(movements, threshold)
 
     # Display search plan
     print("\n" + "="*80)
@@ -211,6 +249,7 @@ def run_intelligent_batch_search(
 
     # Run searches
     results = []
+    pending_saves = []  # (result entry, catalyst) pairs written in one bulk insert at the end
 
     print("\n" + "="*80)
     print("🚀 RUNNING SEARCHES")
@@ -249,37 +288,29 @@ def run_intelligent_batch_search(
                 direction=direction_param
             )
 
-            # Save to MongoDB if enabled
-            if save_to_mongodb:
-                summary = search_result.get("summary", "")
-                timeline = search_result.get("timeline", [])
-
-                # Save with direction from price movement analysis
-                success = save_catalyst(
-                    commodity_group=group,
-                    summary=summary,
-                    timeline=timeline,
-                    search_trigger="auto",
-                    direction=direction
-                )
-
-                if success:
-                    print(f"  ✅ Saved to MongoDB")
-                else:
-                    print(f"  ⚠️  Search completed but failed to save to MongoDB")
-            else:
-                print(f"  ✅ Search completed (not saved to MongoDB)")
-
-            results.append({
+            result = {
                 "group": group,
                 "success": True,
                 "direction": direction,
                 "lookback_days": lookback_days,
                 "5d_change": row['5D_Change'],
                 "10d_change": row['10D_Change'],
-                "saved_to_mongodb": save_to_mongodb,
+                "saved_to_mongodb": False,
                 "timestamp": datetime.now().isoformat()
-            })
+            }
+            results.append(result)
+
+            # Queue for MongoDB if enabled (saved with direction from price movement analysis)
+            if save_to_mongodb:
+                pending_saves.append((result, {
+                    "commodity_group": group,
+                    "summary": search_result.get("summary", ""),
+                    "timeline": search_result.get("timeline", []),
+                    "direction": direction
+                }))
+                print(f"  ✅ Search completed (queued for MongoDB)")
+            else:
+                print(f"  ✅ Search completed (not saved to MongoDB)")
 
             # Delay before next search
             if idx < len(movements) - 1:
@@ -295,6 +326,15 @@ def run_intelligent_batch_search(
                 "timestamp": datetime.now().isoformat()
             })
 
+    # Save all queued catalysts in a single bulk write
+    if pending_saves:
+        saved_flags = save_catalysts_bulk([catalyst for _, catalyst in pending_saves], search_trigger="auto")
+        for (result, _), saved in zip(pending_saves, saved_flags):
+            result["saved_to_mongodb"] = saved
+            if not saved:
+                print(f"  ⚠️  {result['group']}: search completed but failed to save to MongoDB")
+        print(f"\n💾 Saved {sum(saved_flags)}/{len(pending_saves)} catalysts to MongoDB")
+
     return results
 
 